@@ -1,35 +1,52 @@
 from charting.charts import create_candlestick_chart, create_technical_indicators_chart
-from data.data_provider import YFinanceDataProvider
+from data.data_provider import YFinanceDataProvider, longest_period, slice_period
+from charting.indicators import IndicatorStore
+from charting.pivots import PivotStore
+from charting.forecast import forecast_batch, stack_histories
+from charting.screener import stack_panel, screen_panel, SCREEN_COLUMNS, FIFTY_TWO_WEEK_PERIOD
+from agents.analysis_context import AnalysisContext, _safe_read_json
+from agents.compute_executor import ComputeExecutor
+from monitoring import metrics
 import logging
 import pandas as pd
 import numpy as np
-from io import StringIO  # Added to fix deprecation warning
 
 logger = logging.getLogger(__name__)
 
 class AnalysisAgent:
-    def __init__(self):
+    def __init__(self, executor=None):
         self.data_provider = YFinanceDataProvider()
+        # Indicator state is persisted next to the cached history
+        self.indicator_store = IndicatorStore(self.data_provider.cache_backend.cache_dir)
+        # Forecast and trend line work runs in a process pool (ANALYSIS_WORKERS)
+        self.executor = executor or ComputeExecutor()
+        # Multi-scale support/resistance pivots, updated incrementally per ticker and period
+        self.pivot_store = PivotStore()
 
     def _safe_read_json(self, json_data):
         """
         Reads JSON safely to avoid deprecation warning
         """
+        return _safe_read_json(json_data)
+
+    @metrics.timed('build_context')
+    def build_context(self, ticker: str, period: str = "1y"):
+        """
+        Fetch and parse data once for a request so it can be shared by
+        FinanceAgent.run, get_stock_charts and get_forecast_summary.
+        """
         try:
-            if isinstance(json_data, str):
-                # If it's a JSON string, use StringIO
-                return pd.read_json(StringIO(json_data))
-            elif isinstance(json_data, dict):
-                # If it's already a dict, convert directly
-                return pd.DataFrame(json_data)
-            else:
-                # Fallback for other types
-                return pd.read_json(json_data)
+            return AnalysisContext.load(
+                self.data_provider, ticker, period,
+                indicator_store=self.indicator_store, executor=self.executor,
+                pivot_store=self.pivot_store
+            )
         except Exception as e:
-            logger.error(f"Error reading JSON data: {e}")
-            raise
+            logger.error(f"Error building analysis context for {ticker}: {e}")
+            return None
 
-    def get_stock_charts(self, ticker: str, period: str = "1y", include_forecast: bool = True):
+    @metrics.timed('charts')
+    def get_stock_charts(self, ticker: str, period: str = "1y", include_forecast: bool = True, context=None):
         """
         Generate enhanced stock charts with trend lines and forecasts
 
@@ -37,26 +54,41 @@ class AnalysisAgent:
             ticker: Stock symbol
             period: Time period for historical data
             include_forecast: Whether to include price forecasts
+            context: Optional AnalysisContext to reuse already fetched data
         """
         try:
-            data = self.data_provider.get_stock_data(ticker, period)
-            if not data:
-                logger.error(f"No data retrieved for {ticker}")
+            if context is None:
+                context = self.build_context(ticker, period)
+            if context is None:
                 return None, None
 
-            # Convert JSON to DataFrame using the safe method
-            history = self._safe_read_json(data['history'])
+            history = context.history
 
             # Ensure we have enough data
             if len(history) < 30:
                 logger.warning(f"Insufficient data for {ticker}, only {len(history)} records")
                 include_forecast = False
 
+            # Trend lines are ready (or running on the pool) while the forecast is fitted
+            context.start_trend_lines()
+
+            # Share the forecast with get_forecast_summary instead of refitting
+            forecast = None
+            if include_forecast:
+                try:
+                    forecast = context.forecast
+                except Exception as e:
+                    logger.warning(f"Forecast generation failed for {ticker}: {e}")
+                    include_forecast = False
+
             # Create enhanced candlestick chart
-            candlestick_chart = create_candlestick_chart(history, include_forecast=include_forecast)
+            candlestick_chart = create_candlestick_chart(
+                history, include_forecast=include_forecast, forecast=forecast,
+                trend_lines=context.trend_lines
+            )
 
             # Create technical indicators chart
-            technical_indicators_chart = create_technical_indicators_chart(history)
+            technical_indicators_chart = create_technical_indicators_chart(history, indicators=context.indicators)
 
             return candlestick_chart, technical_indicators_chart
 
@@ -64,27 +96,25 @@ class AnalysisAgent:
             logger.error(f"Error getting stock charts for {ticker}: {e}")
             return None, None
 
-    def get_forecast_summary(self, ticker: str, period: str = "1y"):
+    @metrics.timed('forecast_summary')
+    def get_forecast_summary(self, ticker: str, period: str = "1y", context=None):
         """
         Generate a text summary of the price forecast
         KEEPS THE 15-DAY FORECAST LOGIC UNCHANGED
         """
         try:
-            data = self.data_provider.get_stock_data(ticker, period)
-            if not data:
+            if context is None:
+                context = self.build_context(ticker, period)
+            if context is None:
                 return "Unable to generate forecast summary - no data available."
 
-            # FIX: Use the safe method to read JSON
-            history = self._safe_read_json(data['history'])
+            history = context.history
 
             if len(history) < 30:
                 return "Insufficient historical data for reliable forecasting."
 
-            # Import the forecast function (UNCHANGED)
-            from charting.charts import generate_price_forecast
-
             # 15-DAY FORECAST LOGIC COMPLETELY UNCHANGED
-            forecasts, confidence_intervals = generate_price_forecast(history)
+            forecasts, confidence_intervals = context.forecast
 
             current_price = history['Close'].iloc[-1]
             forecast_15d = forecasts[-1]
@@ -118,4 +148,76 @@ class AnalysisAgent:
 
         except Exception as e:
             logger.error(f"Error generating forecast summary: {e}")
-            return "Unable to generate forecast summary due to technical error."
\ No newline at end of file
+            return "Unable to generate forecast summary due to technical error."
+
+    @metrics.timed('forecast_batch')
+    def get_forecast_batch(self, tickers: list, period: str = "1y"):
+        """
+        15-day forecasts for a whole watchlist in one batched pass.
+
+        Data is fetched with a single get_many call and every model is fitted
+        together by forecast_batch, giving the same numbers as
+        get_forecast_summary per ticker.
+
+        Returns:
+            (results, errors): ticker -> dict with current_price, forecasts,
+            lower and upper arrays; ticker -> error message.
+        """
+        data, errors = self.data_provider.get_many(tickers, period)
+
+        histories = {}
+        for ticker, stock_data in data.items():
+            history = self._safe_read_json(stock_data['history'])
+            if len(history) < 30:
+                errors[ticker] = "Insufficient historical data for reliable forecasting."
+                continue
+            histories[ticker] = history
+
+        results = {}
+        if histories:
+            ordered_tickers, prices, volumes = stack_histories(histories)
+            forecasts, lower, upper = forecast_batch(prices, volumes)
+            for row, ticker in enumerate(ordered_tickers):
+                results[ticker] = {
+                    'current_price': float(histories[ticker]['Close'].iloc[-1]),
+                    'forecasts': forecasts[row],
+                    'lower': lower[row],
+                    'upper': upper[row],
+                }
+
+        return results, errors
+
+    @metrics.timed('screener')
+    def screen_watchlist(self, tickers: list, period: str = "1y"):
+        """
+        Rank a watchlist by RSI, MACD crossovers, 52-week levels and 15-day
+        forecast return.
+
+        Histories come from one get_many call (the cache for tickers already
+        fetched) and are stacked into a single panel, so every metric is
+        computed for all tickers at once (see charting/screener.py). At least
+        FIFTY_TWO_WEEK_PERIOD is loaded for the 52-week levels; the other
+        metrics use the last ``period`` of each history.
+
+        Returns:
+            (table, errors): DataFrame with SCREEN_COLUMNS sorted by forecast
+            return; ticker -> error message.
+        """
+        load_period = longest_period(period, FIFTY_TWO_WEEK_PERIOD, pd.Timestamp.now())
+        data, errors = self.data_provider.get_many(tickers, load_period)
+
+        histories, ranges = {}, {}
+        for ticker, stock_data in data.items():
+            history = self._safe_read_json(stock_data['history'])
+            screened = slice_period(history, period)
+            if len(screened) < 30:
+                errors[ticker] = "Insufficient historical data for reliable forecasting."
+                continue
+            histories[ticker] = screened
+            ranges[ticker] = history
+
+        if not histories:
+            return pd.DataFrame(columns=SCREEN_COLUMNS), errors
+        ordered_tickers, panel = stack_panel(histories)
+        _, levels = stack_panel(ranges, columns=('High', 'Low'))
+        return screen_panel(ordered_tickers, panel, levels=levels), errors
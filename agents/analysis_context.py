@@ -0,0 +1,128 @@
+from charting.charts import calculate_technical_indicators, get_price_forecast, trend_lines_from_prices, highs_and_lows
+from monitoring import metrics
+import logging
+import threading
+import pandas as pd
+from io import StringIO
+
+logger = logging.getLogger(__name__)
+
+
+def _safe_read_json(json_data):
+    """
+    Reads JSON safely to avoid deprecation warning
+    """
+    try:
+        if isinstance(json_data, pd.DataFrame):
+            # Already parsed
+            return json_data
+        elif isinstance(json_data, str):
+            # If it's a JSON string, use StringIO
+            return pd.read_json(StringIO(json_data))
+        elif isinstance(json_data, dict):
+            # If it's already a dict, convert directly
+            return pd.DataFrame(json_data)
+        else:
+            # Fallback for other types
+            return pd.read_json(json_data)
+    except Exception as e:
+        logger.error(f"Error reading JSON data: {e}")
+        raise
+
+
+class AnalysisContext:
+    """
+    Stock data for a single analysis request, fetched and parsed once and
+    shared by the agents and charting functions.
+
+    Indicators and the forecast are computed lazily on first access. With an
+    ``indicator_store`` and the full cached series, indicators are computed
+    over the whole series (extended incrementally as bars arrive) and then
+    cut to the requested period. With an ``executor`` (ComputeExecutor), the
+    forecast is computed in a worker process. Trend lines come from the
+    incremental ``pivot_store`` when given, else from the executor.
+    """
+
+    def __init__(self, ticker: str, period: str, stock_data: dict, history: pd.DataFrame,
+                 full_history: pd.DataFrame = None, indicator_store=None, executor=None, pivot_store=None):
+        self.ticker = ticker
+        self.period = period
+        self.stock_data = stock_data
+        self.history = history
+        self.full_history = full_history
+        self.indicator_store = indicator_store
+        self.executor = executor
+        self.pivot_store = pivot_store
+        self.info = {key: value for key, value in stock_data.items() if key != 'history'}
+        self._indicators = None
+        self._forecast = None
+        self._forecast_lock = threading.Lock()
+        self._trend_lines = None
+
+    @classmethod
+    def load(cls, data_provider, ticker: str, period: str = "1y", indicator_store=None, executor=None,
+             pivot_store=None):
+        """Fetch data through the provider and parse the history once."""
+        with metrics.timed('fetch'):
+            stock_data = data_provider.get_stock_data(ticker, period)
+        if not stock_data:
+            logger.error(f"No data retrieved for {ticker}")
+            return None
+
+        with metrics.timed('parse_history'):
+            history = _safe_read_json(stock_data['history'])
+
+        full_history = None
+        if indicator_store is not None and len(history):
+            full_history = data_provider.get_cached_history(ticker)
+            # Only usable if it ends on the same bar as the requested slice
+            if full_history is not None and (not len(full_history) or full_history.index[-1] != history.index[-1]):
+                full_history = None
+
+        return cls(ticker, period, stock_data, history, full_history, indicator_store, executor, pivot_store)
+
+    @property
+    def indicators(self):
+        """RSI, EMA 12/26, MACD, signal and histogram arrays aligned with ``history``."""
+        if self._indicators is None:
+            with metrics.timed('indicators'):
+                if self.indicator_store is None:
+                    self._indicators = calculate_technical_indicators(self.history)
+                else:
+                    base = self.full_history if self.full_history is not None else self.history
+                    arrays = self.indicator_store.get(self.ticker.upper(), base)
+                    bars = len(self.history)
+                    self._indicators = {name: values[len(values) - bars:] for name, values in arrays.items()}
+        return self._indicators
+
+    @property
+    def forecast(self):
+        """(forecasts, confidence_intervals), memoized across requests."""
+        # Charts and the forecast summary may ask concurrently; fit only once
+        with self._forecast_lock:
+            if self._forecast is None:
+                self._forecast = get_price_forecast(self.history, self.ticker, self.period, executor=self.executor)
+        return self._forecast
+
+    def start_trend_lines(self):
+        """Schedule the trend lines so they run while the forecast is computed."""
+        if self._trend_lines is None:
+            if self.pivot_store is not None and {'High', 'Low'} <= set(self.history.columns):
+                # Incremental and cheap, so not worth a round trip to the pool
+                with metrics.timed('trend_lines'):
+                    self._trend_lines = self.pivot_store.trend_lines((self.ticker.upper(), self.period), self.history)
+                return
+            highs, lows = highs_and_lows(self.history)
+            if self.executor is None:
+                with metrics.timed('trend_lines'):
+                    self._trend_lines = trend_lines_from_prices(highs, lows)
+            else:
+                self._trend_lines = self.executor.submit(trend_lines_from_prices, highs, lows)
+
+    @property
+    def trend_lines(self):
+        """Support and resistance lines for ``history``."""
+        self.start_trend_lines()
+        if not isinstance(self._trend_lines, dict):
+            self._trend_lines = self._trend_lines.result()
+        return self._trend_lines
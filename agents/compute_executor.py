@@ -0,0 +1,133 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for forecast fits; 0 runs everything inline
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "0"))
+# Tasks allowed in flight per worker before callers fall back to running inline
+ANALYSIS_QUEUE_DEPTH = int(os.getenv("ANALYSIS_QUEUE_DEPTH", "4"))
+# How long a caller waits for a free queue slot before running inline
+ANALYSIS_QUEUE_TIMEOUT = float(os.getenv("ANALYSIS_QUEUE_TIMEOUT", "0.5"))
+
+
+def _initialize_worker():
+    """Import the numeric modules once per worker instead of on its first task."""
+    import charting.charts  # noqa: F401
+    import charting.forecast  # noqa: F401
+
+
+def _ping():
+    return os.getpid()
+
+
+def _completed(function, args):
+    future = Future()
+    try:
+        future.set_result(function(*args))
+    except BaseException as e:
+        future.set_exception(e)
+    return future
+
+
+class ComputeExecutor:
+    """
+    Runs CPU-bound numeric work (forecast fits) in a process pool so
+    concurrent requests are not serialized on the GIL. Trend lines normally
+    come from the in-process PivotStore (see AnalysisContext) and only use
+    the pool for histories without High/Low columns.
+
+    Tasks take and return plain NumPy arrays / lists, which are cheap to
+    pickle; figures are still assembled in the request process. At most
+    ``max_workers * queue_depth`` tasks are queued; beyond that, and when the
+    pool is disabled (``max_workers=0``) or broken, tasks run inline in the
+    caller's thread.
+
+    Workers use the "spawn" start method, since forking a process that is
+    already running Gradio's threads is unsafe.
+    """
+
+    def __init__(self, max_workers: int = ANALYSIS_WORKERS, queue_depth: int = ANALYSIS_QUEUE_DEPTH,
+                 queue_timeout: float = ANALYSIS_QUEUE_TIMEOUT):
+        self.max_workers = max(0, max_workers)
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(self.max_workers * max(1, queue_depth)) if self.max_workers else None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_workers > 0
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize_worker
+                )
+            return self._pool
+
+    def _reset_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self):
+        """Start every worker process now rather than on the first request."""
+        if not self.enabled:
+            return
+        pool = self._get_pool()
+        try:
+            for future in [pool.submit(_ping) for _ in range(self.max_workers)]:
+                future.result()
+        except BrokenProcessPool as e:
+            logger.error(f"Compute worker failed to start: {e}")
+            self._reset_pool(pool)
+
+    def submit(self, function, *args):
+        """
+        Schedule ``function(*args)`` and return a Future.
+
+        ``function`` must be a module-level function so it can be pickled.
+        """
+        if not self.enabled or not self._slots.acquire(timeout=self.queue_timeout):
+            return _completed(function, args)
+
+        pool = self._get_pool()
+        try:
+            future = pool.submit(function, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._slots.release()
+            logger.warning(f"Compute pool unavailable, running inline: {e}")
+            self._reset_pool(pool)
+            return _completed(function, args)
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, function, *args):
+        """Run ``function(*args)`` on the pool and wait for the result."""
+        future = self.submit(function, *args)
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM killed); recompute here and start a fresh pool next time
+            logger.warning(f"Compute worker crashed, running inline: {e}")
+            with self._lock:
+                pool = self._pool
+            if pool is not None:
+                self._reset_pool(pool)
+            return function(*args)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
@@ -2,7 +2,14 @@ import os
 from dotenv import load_dotenv
 import logging
 from data.data_provider import YFinanceDataProvider
-from gemini_summarizer import summarize_with_gemini
+from gemini_summarizer import (
+    summarize_with_gemini, summarize_with_gemini_stream, StubGeminiClient, GeminiClientManager,
+    get_client_manager, SUMMARY_ERROR
+)
+from agents.analysis_context import _safe_read_json
+from agents.prompt_builder import build_prompt
+from data.summary_cache import SummaryCache, data_version, summary_key
+from monitoring import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +17,7 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 class FinanceAgent:
-    def __init__(self):
+    def __init__(self, client=None, summary_cache=None):
         # Try to get the API key from the environment
         self.api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
 
@@ -21,23 +28,94 @@ class FinanceAgent:
 
         self.data_provider = YFinanceDataProvider()
 
-    def run(self, query: str, ticker: str):
-        try:
-            # Check if the API key is available
-            if not self.api_key:
-                return "Error: Gemini API key not configured. Please set GEMINI_API_KEY environment variable."
+        # GEMINI_CLIENT=stub answers offline without an API key
+        if client is None and os.getenv("GEMINI_CLIENT") == "stub":
+            client = StubGeminiClient()
+        self.client = client
+        # One long-lived client per process, shared by concurrent requests
+        if client is None:
+            self.gemini = get_client_manager(self.api_key)
+        else:
+            self.gemini = GeminiClientManager(self.api_key, transport=lambda api_key, timeout: client)
+
+        # Summaries are reused until the ticker's history is refreshed
+        self.summary_cache = summary_cache or SummaryCache(self.data_provider.cache_backend.cache_dir)
+
+    def _prepare(self, query: str, ticker: str, context=None):
+        """
+        Returns (text, None) when the answer is already known (a cached
+        summary or an error message), else (None, (cache_key, version, prompt)).
+        """
+        # Check if the API key is available
+        if not self.api_key and self.client is None:
+            return "Error: Gemini API key not configured. Please set GEMINI_API_KEY environment variable.", None
 
+        # Reuse data already fetched for this request when available
+        if context is not None:
+            stock_data = context.stock_data
+        else:
             stock_data = self.data_provider.get_stock_data(ticker)
-            if not stock_data:
-                return "Error: Could not retrieve stock data."
+        if not stock_data:
+            return "Error: Could not retrieve stock data.", None
 
-            #Combine data and user query for summarization
+        if context is not None:
+            history, period = context.history, context.period
+        else:
+            history, period = _safe_read_json(stock_data['history']), "1y"
 
+        version = data_version(history)
+        cache_key = summary_key(query, ticker, period, version)
+        summary = self.summary_cache.get(cache_key)
+        metrics.record_cache('summary', summary is not None)
+        if summary is not None:
+            return summary, None
+
+        # Combine the user query with a compact digest of the data (not the raw history)
+        indicators = context.indicators if context is not None else None
+        # The whole cached series, for a 52-week range when the period is shorter
+        full_history = context.full_history if context is not None else None
+        if full_history is None:
+            full_history = self.data_provider.get_cached_history(ticker)
+        with metrics.timed('prompt_build'):
+            text_to_summarize, _ = build_prompt(query, ticker, stock_data, history, indicators,
+                                                full_history=full_history)
+        return None, (cache_key, version, text_to_summarize)
+
+    def run(self, query: str, ticker: str, context=None):
+        try:
+            summary, request = self._prepare(query, ticker, context)
+            if request is None:
+                return summary
 
-            text_to_summarize = f"{query}. Stock data: {stock_data}"
-            summary = summarize_with_gemini(text_to_summarize, self.api_key)
+            cache_key, version, text_to_summarize = request
+            summary = summarize_with_gemini(text_to_summarize, self.api_key, manager=self.gemini)
 
+            if summary != SUMMARY_ERROR:
+                self.summary_cache.put(cache_key, ticker, version, summary)
             return summary
         except Exception as e:
             logger.error(f"Error running Finance Agent: {e}")
-            return f"Error: Could not retrieve financial summary. {str(e)}"
\ No newline at end of file
+            return f"Error: Could not retrieve financial summary. {str(e)}"
+
+    def run_stream(self, query: str, ticker: str, context=None):
+        """
+        Streaming version of run: yields the summary text accumulated so far
+        each time Gemini sends a chunk. Cached summaries are yielded at once.
+        """
+        try:
+            summary, request = self._prepare(query, ticker, context)
+            if request is None:
+                yield summary
+                return
+
+            cache_key, version, text_to_summarize = request
+            summary = ""
+            for chunk in summarize_with_gemini_stream(text_to_summarize, self.api_key, manager=self.gemini):
+                summary += chunk
+                yield summary
+
+            if summary and SUMMARY_ERROR not in summary:
+                self.summary_cache.put(cache_key, ticker, version, summary)
+        except Exception as e:
+            logger.error(f"Error running Finance Agent: {e}")
+            yield f"Error: Could not retrieve financial summary. {str(e)}"
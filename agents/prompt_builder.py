@@ -0,0 +1,190 @@
+import logging
+import os
+import numpy as np
+import pandas as pd
+from charting.indicators import compute_indicators
+
+logger = logging.getLogger(__name__)
+
+# Maximum prompt size sent to Gemini, in (estimated) tokens
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "600"))
+# Rough English/number text ratio; good enough for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+
+TRADING_DAYS = 252
+FIFTY_TWO_WEEKS = pd.Timedelta(weeks=52)
+# A series starting this close to 52 weeks back (weekends, holidays) still covers them
+RANGE_START_TOLERANCE = pd.Timedelta(days=7)
+RETURN_HORIZONS = (('1d', 1), ('1w', 5), ('1mo', 21), ('3mo', 63), ('6mo', 126), ('1y', 252), ('3y', 756), ('5y', 1260))
+RECENT_CLOSES = 10
+
+
+def estimate_tokens(text: str):
+    """Approximate token count of ``text``."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _percent(value):
+    return f"{value * 100:+.2f}%"
+
+
+def _money(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "n/a"
+    value = float(value)
+    for threshold, suffix in ((1e12, 'T'), (1e9, 'B'), (1e6, 'M')):
+        if abs(value) >= threshold:
+            return f"${value / threshold:.2f}{suffix}"
+    return f"${value:.2f}"
+
+
+def _price_section(ticker: str, stock_data: dict, history: pd.DataFrame, close: np.ndarray):
+    first, last = history.index[0], history.index[-1]
+    lines = [
+        f"Ticker: {ticker.upper()}",
+        f"Data: {len(close)} daily bars, {first:%Y-%m-%d} to {last:%Y-%m-%d}",
+        f"Last close: {_money(close[-1])}",
+    ]
+    if stock_data.get('market_cap'):
+        lines.append(f"Market cap: {_money(stock_data['market_cap'])}")
+    return lines
+
+
+def _returns_section(close: np.ndarray):
+    returns = [f"{label} {_percent(close[-1] / close[-1 - bars] - 1)}"
+               for label, bars in RETURN_HORIZONS if len(close) > bars]
+    returns.append(f"period {_percent(close[-1] / close[0] - 1)}")
+    return ["Returns: " + ", ".join(returns)]
+
+
+def _risk_section(close: np.ndarray):
+    log_returns = np.diff(np.log(close))
+    if len(log_returns) < 2:
+        return []
+    annualize = np.sqrt(TRADING_DAYS)
+    volatility = [f"20d {np.std(log_returns[-20:]) * annualize * 100:.1f}%"] if len(log_returns) >= 20 else []
+    volatility.append(f"period {np.std(log_returns) * annualize * 100:.1f}%")
+
+    running_peak = np.maximum.accumulate(close)
+    drawdowns = close / running_peak - 1
+    return [
+        "Annualized volatility: " + ", ".join(volatility),
+        f"Max drawdown: {_percent(drawdowns.min())}, current drawdown: {_percent(drawdowns[-1])}",
+    ]
+
+
+def _year_window(history: pd.DataFrame, full_history: pd.DataFrame):
+    """Closes of the last 52 weeks, or None when neither series covers them."""
+    for series in (full_history, history):
+        if series is None or not len(series) or series.index[-1] != history.index[-1]:
+            continue
+        start = series.index[-1] - FIFTY_TWO_WEEKS
+        if series.index[0] <= start + RANGE_START_TOLERANCE:
+            return series['Close'].to_numpy(dtype='float64')[series.index.searchsorted(start):]
+    return None
+
+
+def _levels_section(stock_data: dict, history: pd.DataFrame, close: np.ndarray, full_history: pd.DataFrame = None):
+    high = stock_data.get('fiftyTwoWeekHigh')
+    low = stock_data.get('fiftyTwoWeekLow')
+    if not high or not low:
+        # Without the info fields, only a history spanning the 52 weeks gives the range
+        window = _year_window(history, full_history)
+        if window is None:
+            return []
+        high, low = high or window.max(), low or window.min()
+    return [
+        f"52-week range: {_money(low)} - {_money(high)} "
+        f"(last close {_percent(close[-1] / high - 1)} from high, {_percent(close[-1] / low - 1)} from low)"
+    ]
+
+
+def _indicator_section(indicators: dict):
+    def last(name):
+        return float(indicators[name][-1]) if len(indicators[name]) else float('nan')
+
+    rsi = last('rsi')
+    state = "overbought" if rsi > 70 else "oversold" if rsi < 30 else "neutral"
+    return [
+        f"RSI(14): {rsi:.1f} ({state})",
+        f"MACD: {last('macd'):.3f}, signal {last('signal'):.3f}, histogram {last('histogram'):+.3f}",
+        f"EMA12 {_money(last('ema12'))}, EMA26 {_money(last('ema26'))}",
+    ]
+
+
+def _volume_section(history: pd.DataFrame):
+    if 'Volume' not in history.columns or not len(history):
+        return []
+    volume = history['Volume'].to_numpy(dtype='float64')
+    average = volume.mean()
+    if not average:
+        return []
+    return [f"Volume: 20d average {volume[-20:].mean() / average:.2f}x the period average"]
+
+
+def _recent_section(history: pd.DataFrame, close: np.ndarray):
+    recent = zip(history.index[-RECENT_CLOSES:], close[-RECENT_CLOSES:])
+    return ["Recent closes: " + ", ".join(f"{stamp:%m-%d} {value:.2f}" for stamp, value in recent)]
+
+
+def build_stock_digest(ticker: str, stock_data: dict, history: pd.DataFrame, indicators: dict = None,
+                       full_history: pd.DataFrame = None):
+    """
+    Compact statistical summary of ``history`` as (name, lines) sections,
+    most important first.
+
+    ``indicators`` are reused when given (e.g. from an AnalysisContext),
+    otherwise computed from the closes. ``full_history`` is the ticker's
+    whole cached series; when the info fields lack the 52-week range, it is
+    computed from that series (or ``history``) if it spans 52 weeks, and
+    left out otherwise.
+    """
+    close = history['Close'].to_numpy(dtype='float64')
+    if not len(close):
+        return [('price', [f"Ticker: {ticker.upper()}", "No price history available"])]
+    if indicators is None:
+        indicators = compute_indicators(close)
+
+    return [
+        ('price', _price_section(ticker, stock_data, history, close)),
+        ('returns', _returns_section(close)),
+        ('risk', _risk_section(close)),
+        ('levels', _levels_section(stock_data, history, close, full_history)),
+        ('indicators', _indicator_section(indicators)),
+        ('volume', _volume_section(history)),
+        ('recent', _recent_section(history, close)),
+    ]
+
+
+def build_prompt(query: str, ticker: str, stock_data: dict, history: pd.DataFrame,
+                 indicators: dict = None, token_budget: int = PROMPT_TOKEN_BUDGET, full_history: pd.DataFrame = None):
+    """
+    Gemini prompt with the user query and a digest of the stock data.
+
+    Lowest-priority digest sections are dropped until the prompt fits in
+    ``token_budget``; if the query plus the first section still do not fit,
+    the text is truncated.
+
+    Returns:
+        (prompt, estimated_tokens)
+    """
+    sections = build_stock_digest(ticker, stock_data, history, indicators, full_history)
+
+    def render(kept):
+        lines = [line for _, section in kept for line in section]
+        return f"{query}\n\nStock data summary:\n" + "\n".join(lines)
+
+    prompt = render(sections)
+    while estimate_tokens(prompt) > token_budget and len(sections) > 1:
+        sections = sections[:-1]
+        prompt = render(sections)
+
+    if estimate_tokens(prompt) > token_budget:
+        prompt = prompt[:token_budget * CHARS_PER_TOKEN]
+
+    tokens = estimate_tokens(prompt)
+    logger.info(
+        f"Prompt for {ticker.upper()}: ~{tokens} tokens "
+        f"(budget {token_budget}, sections: {', '.join(name for name, _ in sections)})"
+    )
+    return prompt, tokens
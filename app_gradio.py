@@ -1,11 +1,38 @@
 import gradio as gr
 from agents.finance_agent import FinanceAgent
 from agents.analysis_agent import AnalysisAgent
+from cache_warmer import load_watchlist
+from monitoring import metrics
+from monitoring.profiling import RequestProfile
+import asyncio
+import contextlib
 import os
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+def warm_up(interface):
+    """
+    Load the modules that are imported lazily (Plotly, SciPy, yfinance,
+    google-genai), prebuild the figure layouts and start the compute
+    workers, so the first request does not pay for them.
+    """
+    start = time.perf_counter()
+    try:
+        from charting.figures import prebuild_layouts
+        prebuild_layouts()
+        import scipy.signal  # noqa: F401  (indicators, trend lines)
+        import yfinance  # noqa: F401
+        from google import genai  # noqa: F401
+        interface.analysis_agent.executor.warm_up()
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+        return
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
 class GradioInterface:
     def __init__(self):
         self.finance_agent = FinanceAgent()
@@ -14,26 +41,143 @@ class GradioInterface:
     def analyze_stock(self, ticker: str, report_type: str, period: str = "1y", include_forecast: bool = True):
         """
         Enhanced stock analysis with forecasting capabilities
+
+        Generator yielding (finance_summary, candlestick_chart,
+        technical_indicators_chart, forecast_summary) tuples as results come
+        in; the last one is complete. Synchronous wrapper around
+        analyze_stock_stream.
         """
+        loop = asyncio.new_event_loop()
+        stream = self.analyze_stock_stream(ticker, report_type, period, include_forecast)
         try:
-            # Get financial summary
-            finance_summary = self.finance_agent.run(report_type.replace("ticker", ticker), ticker=ticker)
-
-            # Get enhanced charts with forecasting
-            candlestick_chart, technical_indicators_chart = self.analysis_agent.get_stock_charts(
-                ticker, period, include_forecast=include_forecast
-            )
+            while True:
+                try:
+                    yield loop.run_until_complete(stream.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(stream.aclose())
+            loop.close()
 
-            # Get forecast summary if forecasting is enabled
-            forecast_summary = ""
-            if include_forecast:
-                forecast_summary = self.analysis_agent.get_forecast_summary(ticker, period)
+    def screen_watchlist(self, tickers: str, period: str = "1y"):
+        """
+        Screener tab: rank comma or space separated ``tickers``.
 
-            return finance_summary, candlestick_chart, technical_indicators_chart, forecast_summary
+        Returns (table, status markdown).
+        """
+        symbols = [symbol for symbol in tickers.replace(',', ' ').upper().split() if symbol]
+        if not symbols:
+            return None, "Enter at least one ticker."
 
+        start = time.perf_counter()
+        try:
+            table, errors = self.analysis_agent.screen_watchlist(symbols, period)
         except Exception as e:
-            logger.error(f"Error analyzing stock: {e}")
-            return "Error: Could not analyze stock.", None, None, "Forecast unavailable due to error."
+            logger.error(f"Screener failed: {e}")
+            return None, f"❌ Screener failed: {e}"
+
+        status = f"Screened {len(table)} of {len(dict.fromkeys(symbols))} tickers in {time.perf_counter() - start:.1f}s"
+        if errors:
+            status += "  \n⚠️ Skipped: " + ", ".join(f"{ticker} ({error})" for ticker, error in errors.items())
+        return table, status
+
+    async def analyze_stock_stream(self, ticker: str, report_type: str, period: str = "1y", include_forecast: bool = True):
+        """
+        Async version of analyze_stock that yields the four outputs as they finish.
+
+        The data is fetched once, then the Gemini summary, the charts and the
+        forecast summary run concurrently in worker threads. The Gemini
+        summary is streamed, so its text grows as chunks arrive. Each yield is
+        a full (finance_summary, candlestick_chart, technical_indicators_chart,
+        forecast_summary) tuple; outputs still being computed show a
+        placeholder.
+
+        Each request is timed and counted as in flight (see
+        monitoring/metrics.py) and, with PROFILE_DIR set, profiled.
+        """
+        profile = RequestProfile(f"{ticker}-{period}")
+        with metrics.in_flight('analysis'), metrics.timed('request'):
+            try:
+                updates = self._analysis_updates(ticker, report_type, period, include_forecast, profile)
+                async with contextlib.aclosing(updates):
+                    async for outputs in updates:
+                        yield outputs
+            finally:
+                profile.dump()
+
+    async def _analysis_updates(self, ticker: str, report_type: str, period: str, include_forecast: bool, profile):
+        outputs = [
+            "⏳ Generating AI analysis...",
+            None,
+            None,
+            "⏳ Calculating forecast..." if include_forecast else ""
+        ]
+        yield tuple(outputs)
+
+        context = await asyncio.to_thread(profile.run, self.analysis_agent.build_context, ticker, period)
+        if context is None:
+            yield "Error: Could not analyze stock.", None, None, "Forecast unavailable due to error."
+            return
+
+        loop = asyncio.get_running_loop()
+        updates = asyncio.Queue()  # (positions, values), or None when a stage is done
+
+        async def stage(positions, fallback, function, *args):
+            try:
+                values = await asyncio.to_thread(profile.run, function, *args)
+                await updates.put((positions, values if len(positions) > 1 else (values,)))
+            except Exception as e:
+                logger.error(f"Error analyzing stock: {e}")
+                await updates.put((positions, fallback if len(positions) > 1 else (fallback,)))
+            finally:
+                await updates.put(None)
+
+        def stream_summary():
+            for text in self.finance_agent.run_stream(report_type.replace("ticker", ticker), ticker, context):
+                loop.call_soon_threadsafe(updates.put_nowait, ((0,), (text,)))
+
+        async def summary_stage():
+            try:
+                await asyncio.to_thread(profile.run, stream_summary)
+            except Exception as e:
+                logger.error(f"Error analyzing stock: {e}")
+                await updates.put(((0,), ("Error: Could not retrieve financial summary.",)))
+            finally:
+                await updates.put(None)
+
+        stages = [
+            summary_stage(),
+            stage((1, 2), (None, None), self.analysis_agent.get_stock_charts,
+                  ticker, period, include_forecast, context),
+        ]
+        if include_forecast:
+            stages.append(stage((3,), "Forecast unavailable due to error.", self.analysis_agent.get_forecast_summary,
+                                ticker, period, context))
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in stages]
+
+        running = len(tasks)
+        try:
+            while running:
+                update = await updates.get()
+                # Coalesce everything that arrived meanwhile into a single yield
+                batch = [update]
+                while not updates.empty():
+                    batch.append(updates.get_nowait())
+
+                changed = False
+                for update in batch:
+                    if update is None:
+                        running -= 1
+                        continue
+                    positions, values = update
+                    for position, value in zip(positions, values):
+                        outputs[position] = value
+                    changed = True
+                if changed:
+                    yield tuple(outputs)
+        finally:
+            for task in tasks:
+                task.cancel()
 
     def create_interface(self):
         # Define the mapping between display names and actual report types
@@ -44,6 +188,13 @@ class GradioInterface:
             "🔍 Risk Assessment": "Analyze the risk profile and volatility characteristics of ticker stock."
         }
 
+        # The screener starts from the cache warmer's watchlist, whose tickers are usually cached
+        try:
+            default_watchlist = load_watchlist()['tickers']
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read watchlist: {e}")
+            default_watchlist = ["AAPL", "MSFT", "TSLA", "GOOGL", "NVDA"]
+
         # Custom CSS for better styling
         # NOTE: In Gradio 6.0+, css is passed to launch(), not Blocks()
         custom_css = """
@@ -155,11 +306,43 @@ class GradioInterface:
                             elem_classes=["forecast-panel"]
                         )
 
-            # Event handler
-            analyze_button.click(
-                fn=lambda ticker, selected_report_name, period, include_forecast: self.analyze_stock(
+            # Watchlist screener
+            with gr.Tab("🔎 Watchlist Screener"):
+                with gr.Row():
+                    screener_tickers_input = gr.Textbox(
+                        label="📋 Tickers",
+                        placeholder="e.g., AAPL, MSFT, TSLA",
+                        value=", ".join(default_watchlist),
+                        scale=4
+                    )
+                    screener_period_input = gr.Dropdown(
+                        choices=["6mo", "1y", "2y", "5y"],
+                        label="📅 Historical Data Period",
+                        value="1y",
+                        scale=1
+                    )
+                screener_button = gr.Button("🔎 Screen Watchlist", variant="primary")
+                screener_status_output = gr.Markdown()
+                screener_table_output = gr.Dataframe(
+                    label="Ranked by 15-day forecast return (click a column header to sort)",
+                    interactive=False
+                )
+
+            screener_button.click(
+                fn=self.screen_watchlist,
+                inputs=[screener_tickers_input, screener_period_input],
+                outputs=[screener_table_output, screener_status_output]
+            )
+
+            # Event handler: outputs stream in as each stage finishes
+            async def run_analysis(ticker, selected_report_name, period, include_forecast):
+                async for outputs in self.analyze_stock_stream(
                     ticker, report_type_mapping[selected_report_name], period, include_forecast
-                ),
+                ):
+                    yield outputs
+
+            analyze_button.click(
+                fn=run_analysis,
                 inputs=[ticker_input, report_type_input, period_input, include_forecast_input],
                 outputs=[finance_summary_output, candlestick_chart_output, technical_indicators_chart_output, forecast_summary_output]
             )
@@ -179,6 +362,20 @@ class GradioInterface:
 
 if __name__ == '__main__':
     interface = GradioInterface()
+
+    # Optional Prometheus endpoint (METRICS_PORT) next to the app
+    if metrics.METRICS_PORT:
+        metrics.start_metrics_server()
+
+    # Optional background cache pre-warming for the configured watchlist
+    if os.getenv("CACHE_WARMER") == "1":
+        from cache_warmer import CacheWarmer
+        CacheWarmer.from_config(data_provider=interface.analysis_agent.data_provider).start()
+
     demo, custom_css = interface.create_interface()
     # css is now passed to launch() in Gradio 6.0+
-    demo.launch(show_error=True, css=custom_css)
+    demo.launch(show_error=True, css=custom_css, prevent_thread_lock=True)
+
+    # The server is accepting connections; load the heavy modules while it waits for the first request
+    threading.Thread(target=warm_up, args=(interface,), name="warm-up", daemon=True).start()
+    demo.block_thread()
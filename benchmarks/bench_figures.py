@@ -0,0 +1,157 @@
+"""
+Times building and serializing the two dashboard figures with the figure
+factory (prebuilt layouts, typed arrays) against the previous builders
+(validated graph objects, ISO date strings, full template per figure), and
+reports the JSON payload each one sends to the browser.
+
+    python -m benchmarks.bench_figures
+"""
+import time
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from benchmarks.synthetic import synthetic_history, PERIOD_BARS
+from charting.charts import (
+    create_candlestick_chart, create_technical_indicators_chart, calculate_technical_indicators,
+    calculate_trend_lines, generate_price_forecast, _downsampled
+)
+from charting.pivots import PRIMARY_ORDER
+from charting.downsample import CHART_MAX_POINTS, downsample_ohlc, minmax_indices
+
+
+def reference_candlestick_chart(history, forecast, trend_lines, max_points=CHART_MAX_POINTS):
+    """create_candlestick_chart as it was built before the figure factory."""
+    fig = go.Figure()
+    candles = downsample_ohlc(history, max_points)
+    fig.add_trace(go.Candlestick(
+        x=candles.index, open=candles['Open'], high=candles['High'], low=candles['Low'], close=candles['Close'],
+        name="OHLC", increasing_line_color='#00ff88', decreasing_line_color='#ff4444'
+    ))
+    for name, color in (('resistance', 'red'), ('support', 'green')):
+        if name in trend_lines:
+            line = trend_lines[name]
+            start_idx, end_idx = max(0, len(history) - 100), len(history) - 1
+            fig.add_trace(go.Scatter(
+                x=[history.index[start_idx], history.index[end_idx]],
+                y=[line['slope'] * start_idx + line['intercept'], line['slope'] * end_idx + line['intercept']],
+                mode='lines', line=dict(color=color, width=2, dash='dash'),
+                name=f'{name.title()} Trend', showlegend=True
+            ))
+    for order, lines in trend_lines.get('scales', {}).items():
+        if order == PRIMARY_ORDER:
+            continue
+        start_idx, end_idx = max(0, len(history) - 100 * order // PRIMARY_ORDER), len(history) - 1
+        for name, color in (('resistance', 'red'), ('support', 'green')):
+            if name in lines:
+                line = lines[name]
+                fig.add_trace(go.Scatter(
+                    x=[history.index[start_idx], history.index[end_idx]],
+                    y=[line['slope'] * start_idx + line['intercept'], line['slope'] * end_idx + line['intercept']],
+                    mode='lines', line=dict(color=color, width=1, dash='dot'),
+                    name=f'{name.title()} ({order}-bar pivots)', visible='legendonly', showlegend=True
+                ))
+
+    forecasts, confidence_intervals = forecast
+    future_dates = pd.date_range(start=history.index[-1] + pd.Timedelta(days=1), periods=len(forecasts), freq='D')
+    fig.add_trace(go.Scatter(x=future_dates, y=forecasts, mode='lines', line=dict(color='orange', width=3),
+                             name='Median Forecast', showlegend=True))
+    upper_bounds = [ci['upper'] for ci in confidence_intervals]
+    lower_bounds = [ci['lower'] for ci in confidence_intervals]
+    fig.add_trace(go.Scatter(
+        x=list(future_dates) + list(future_dates[::-1]), y=upper_bounds + lower_bounds[::-1],
+        fill='toself', fillcolor='rgba(255, 165, 0, 0.3)', line=dict(color='rgba(255, 165, 0, 0)'),
+        name='Forecast Range (95% CI)', showlegend=True
+    ))
+    fig.add_trace(go.Scatter(
+        x=[history.index[-1], future_dates[0]], y=[history['Close'].iloc[-1], forecasts[0]],
+        mode='lines', line=dict(color='orange', width=2, dash='dot'), showlegend=False
+    ))
+    fig.update_layout(
+        title={'text': 'Enhanced Candlestick Chart with Trend Lines and Forecast', 'x': 0.5, 'font': {'size': 18}},
+        xaxis_title='Date', yaxis_title='Price ($)', template='plotly_dark', height=700, showlegend=True,
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, bgcolor="rgba(0,0,0,0.5)"),
+        xaxis=dict(rangeslider=dict(visible=False), type='date'), yaxis=dict(fixedrange=False)
+    )
+    return fig
+
+
+def reference_indicators_chart(history, indicators, max_points=CHART_MAX_POINTS):
+    """create_technical_indicators_chart as it was built before the figure factory."""
+    dates = history.index
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.03,
+                        subplot_titles=('Price with Moving Averages', 'RSI', 'MACD'), row_heights=[0.5, 0.25, 0.25])
+    lines = (
+        (history['Close'], 'Close Price', '#1f77b4', 2, 1), (indicators['ema12'], 'EMA 12', 'orange', 1, 1),
+        (indicators['ema26'], 'EMA 26', 'red', 1, 1), (indicators['rsi'], 'RSI', 'purple', 2, 2),
+        (indicators['macd'], 'MACD', 'blue', 2, 3), (indicators['signal'], 'Signal', 'red', 2, 3),
+    )
+    for values, name, color, width, row in lines:
+        fig.add_trace(go.Scatter(**_downsampled(dates, values, max_points), name=name,
+                                 line=dict(color=color, width=width)), row=row, col=1)
+    bars = _downsampled(dates, indicators['histogram'], max_points, select=minmax_indices)
+    fig.add_trace(go.Bar(**bars, name='MACD Histogram', marker_color=np.where(bars['y'] >= 0, 'green', 'red'),
+                         opacity=0.6), row=3, col=1)
+    fig.add_hline(y=70, line_dash="dash", line_color="red", row=2, col=1)
+    fig.add_hline(y=30, line_dash="dash", line_color="green", row=2, col=1)
+    fig.add_hline(y=50, line_dash="dot", line_color="gray", row=2, col=1)
+    fig.add_hline(y=0, line_dash="solid", line_color="gray", row=3, col=1)
+    fig.update_layout(height=800, showlegend=True, title_text="Advanced Technical Indicators", template='plotly_dark')
+    return fig
+
+
+def best_of(function, repeat=10):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def check_equivalent(reference, factory):
+    """Same traces and values; the factory figure also passes full Plotly validation."""
+    go.Figure(factory.to_dict())
+    assert len(reference.data) == len(factory.data)
+    for expected, actual in zip(reference.data, factory.data):
+        assert expected.type == actual.type and expected.name == actual.name
+        for column in ('y', 'open', 'close'):
+            if getattr(expected, column, None) is not None:
+                assert np.allclose(np.asarray(getattr(expected, column), dtype='float64'),
+                                   np.asarray(getattr(actual, column), dtype='float64'), equal_nan=True)
+
+
+def main():
+    print(f"{'period':>6} {'bars':>6} {'build ms':>17} {'to_json ms':>17} {'payload KB':>17}")
+    print(f"{'':>6} {'':>6} {'before':>8} {'after':>8} {'before':>8} {'after':>8} {'before':>8} {'after':>8}")
+    for period, bars in PERIOD_BARS.items():
+        if bars < 30:
+            continue
+        history = synthetic_history(bars, seed=bars)
+        forecast = generate_price_forecast(history)
+        trend_lines = calculate_trend_lines(history)
+        indicators = calculate_technical_indicators(history)
+
+        def before():
+            return (reference_candlestick_chart(history, forecast, trend_lines),
+                    reference_indicators_chart(history, indicators))
+
+        def after():
+            return (create_candlestick_chart(history, forecast=forecast, trend_lines=trend_lines),
+                    create_technical_indicators_chart(history, indicators=indicators))
+
+        build_before, figures_before = best_of(before)
+        build_after, figures_after = best_of(after)
+        for reference, factory in zip(figures_before, figures_after):
+            check_equivalent(reference, factory)
+
+        json_before, payload_before = best_of(lambda: [fig.to_json() for fig in figures_before])
+        json_after, payload_after = best_of(lambda: [fig.to_json() for fig in figures_after])
+        size_before = sum(len(payload) for payload in payload_before) / 1024
+        size_after = sum(len(payload) for payload in payload_after) / 1024
+        print(f"{period:>6} {bars:>6} {build_before * 1e3:>8.1f} {build_after * 1e3:>8.1f} "
+              f"{json_before * 1e3:>8.1f} {json_after * 1e3:>8.1f} {size_before:>8.1f} {size_after:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
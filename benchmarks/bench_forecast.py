@@ -0,0 +1,73 @@
+"""
+Times the closed-form forecast engine against the scikit-learn reference
+of the same model (tests/test_forecast.py checks they agree), and the batch
+mode against per-ticker forecasts.
+
+    python -m benchmarks.bench_forecast
+"""
+import time
+import numpy as np
+from benchmarks.synthetic import synthetic_history, PERIOD_BARS
+from charting.forecast import forecast_prices, forecast_batch, stack_histories, trend_forecast
+from tests.test_forecast import reference_forecast
+
+# The app only forecasts with at least 30 bars (see AnalysisAgent)
+MIN_FORECAST_BARS = 30
+
+
+def best_of(function, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(f"{'period':>6} {'bars':>6} {'sklearn ms':>11} {'closed-form ms':>15} {'max rel diff':>13}")
+    for period, bars in PERIOD_BARS.items():
+        if bars < MIN_FORECAST_BARS:
+            continue
+        history = synthetic_history(bars, seed=bars)
+        prices = history['Close'].to_numpy(dtype='float64')
+        volumes = history['Volume'].to_numpy(dtype='float64')
+
+        expected = reference_forecast(prices, volumes)
+        actual = forecast_prices(prices, volumes)
+        rel_diff = np.max(np.abs(actual - expected) / np.abs(expected))
+        assert np.allclose(actual, expected, rtol=1e-6), f"{period}: forecast differs from reference"
+
+        reference_time = best_of(lambda: reference_forecast(prices, volumes))
+        engine_time = best_of(lambda: forecast_prices(prices, volumes))
+        print(f"{period:>6} {bars:>6} {reference_time * 1e3:>11.2f} {engine_time * 1e3:>15.2f} {rel_diff:>13.2e}")
+
+
+def main_batch(tickers=500):
+    sizes = [PERIOD_BARS[period] for period in ('3mo', '1y', '2y', '5y', '10y')]
+    histories = {f"T{i}": synthetic_history(sizes[i % len(sizes)], seed=i) for i in range(tickers)}
+    ordered, prices, volumes = stack_histories(histories)
+
+    def single(ticker):
+        prices = histories[ticker]['Close'].to_numpy(dtype='float64')
+        try:
+            return forecast_prices(prices, histories[ticker]['Volume'].to_numpy(dtype='float64'))
+        except ValueError:
+            return trend_forecast(prices)
+
+    def per_ticker():
+        return [single(ticker) for ticker in ordered]
+
+    expected = np.array(per_ticker())
+    actual, _, _ = forecast_batch(prices, volumes)
+    assert np.allclose(actual, expected, rtol=1e-6), "batch forecasts differ from per-ticker forecasts"
+
+    loop_time = best_of(per_ticker, repeat=3)
+    batch_time = best_of(lambda: forecast_batch(prices, volumes), repeat=3)
+    print(f"\n{tickers} tickers: per-ticker loop {loop_time * 1e3:.0f} ms, "
+          f"forecast_batch {batch_time * 1e3:.0f} ms ({loop_time / batch_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
+    main_batch()
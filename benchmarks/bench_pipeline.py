@@ -0,0 +1,255 @@
+"""
+Offline benchmark of the request pipeline, one stage at a time:
+
+    data provider (cold fetch, warm disk cache and warm memory cache, for
+    each cache backend) -> history parsing -> indicators, trend lines and
+    forecast -> figures -> figure JSON
+
+Histories are synthetic, from 1mo to 30y of daily bars, and the provider
+uses a fake yfinance client, so no network access is needed. Each stage
+reports its best and median wall time and its peak traced memory. Results
+are written as JSON. With ``--compare``, stages that got slower than a
+baseline file are listed and the exit code is 1.
+
+    python -m benchmarks.bench_pipeline [--repeat 5] [--sizes 1y 30y]
+        [--output bench_pipeline.json] [--compare baseline.json] [--tolerance 1.2]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import synthetic_history, PERIOD_BARS
+from agents.analysis_context import _safe_read_json
+from charting.charts import (
+    calculate_technical_indicators, calculate_trend_lines, generate_price_forecast,
+    create_candlestick_chart, create_technical_indicators_chart
+)
+from data.cache_backends import CACHE_BACKENDS, create_cache_backend
+from data.data_provider import YFinanceDataProvider, MemoryCache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TICKER = "BENCH"
+
+# yfinance has no 30y period; the provider fetches it as 'max'
+PROVIDER_PERIODS = {'30y': 'max'}
+
+# Stages faster than this are too noisy to flag in --compare
+COMPARE_FLOOR_MS = 0.1
+
+
+class SyntheticClient:
+    """Stands in for YFinanceClient and always returns the same history."""
+
+    def __init__(self, history: pd.DataFrame):
+        self._history = history
+
+    def info(self, ticker: str):
+        close = float(self._history['Close'].iloc[-1])
+        return {
+            'currentPrice': close,
+            'marketCap': close * 1e9,
+            'fiftyTwoWeekHigh': float(self._history['High'].max()),
+            'fiftyTwoWeekLow': float(self._history['Low'].min()),
+        }
+
+    def history(self, ticker: str, period: str = None, start=None):
+        return self._history.copy()
+
+    def download(self, tickers: list, period: str):
+        return {ticker: self._history.copy() for ticker in tickers}
+
+
+def measure(function, repeat: int, setup=None):
+    """
+    Run ``function(setup())`` (or ``function()``) once untimed, then
+    ``repeat`` timed times, then once more under tracemalloc.
+
+    Returns best_ms, median_ms and peak_kb. ``setup`` runs outside the timing.
+    """
+    def call():
+        return function(setup()) if setup else function()
+
+    call()
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        function(argument) if setup else function()
+        timings.append(time.perf_counter() - start)
+
+    argument = setup() if setup else None
+    tracemalloc.start()
+    try:
+        function(argument) if setup else function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'best_ms': min(timings) * 1e3,
+        'median_ms': statistics.median(timings) * 1e3,
+        'peak_kb': peak / 1024,
+    }
+
+
+def provider_stages(history: pd.DataFrame, period: str, repeat: int, workdir: str):
+    """Cold, warm-disk and warm-memory get_stock_data for every cache backend."""
+    client = SyntheticClient(history)
+    results = {}
+    for backend in sorted(CACHE_BACKENDS):
+        def provider(cache_dir):
+            return YFinanceDataProvider(
+                cache_backend=create_cache_backend(backend, cache_dir),
+                memory_cache=MemoryCache(),
+                client=client
+            )
+
+        # Cold: empty cache directory, so the client is called and the entry written
+        results[f'provider.cold.{backend}'] = measure(
+            lambda fresh: fresh.get_stock_data(TICKER, period), repeat,
+            setup=lambda: provider(tempfile.mkdtemp(dir=workdir))
+        )
+
+        warm_dir = tempfile.mkdtemp(dir=workdir)
+        warm = provider(warm_dir)
+        warm.get_stock_data(TICKER, period)
+        # Warm disk: populated directory, empty memory tier
+        results[f'provider.warm_disk.{backend}'] = measure(
+            lambda fresh: fresh.get_stock_data(TICKER, period), repeat,
+            setup=lambda: provider(warm_dir)
+        )
+        results[f'provider.warm_memory.{backend}'] = measure(
+            lambda: warm.get_stock_data(TICKER, period), repeat
+        )
+    return results
+
+
+def compute_stages(history: pd.DataFrame, repeat: int):
+    """Parsing, analytics and figure stages on an already loaded history."""
+    results = {}
+    history_json = history.to_json(date_format='iso')
+    results['parse.dataframe'] = measure(lambda: _safe_read_json(history), repeat)
+    results['parse.json'] = measure(lambda: _safe_read_json(history_json), repeat)
+
+    results['indicators'] = measure(lambda: calculate_technical_indicators(history), repeat)
+    results['trend_lines'] = measure(lambda: calculate_trend_lines(history), repeat)
+    results['forecast'] = measure(lambda: generate_price_forecast(history), repeat)
+
+    indicators = calculate_technical_indicators(history)
+    trend_lines = calculate_trend_lines(history)
+    forecast = generate_price_forecast(history)
+    results['figure.candlestick'] = measure(
+        lambda: create_candlestick_chart(history, forecast=forecast, trend_lines=trend_lines), repeat
+    )
+    results['figure.indicators'] = measure(
+        lambda: create_technical_indicators_chart(history, indicators=indicators), repeat
+    )
+
+    figures = (create_candlestick_chart(history, forecast=forecast, trend_lines=trend_lines),
+               create_technical_indicators_chart(history, indicators=indicators))
+    results['figure.to_json'] = measure(lambda: [figure.to_json() for figure in figures], repeat)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(repeat: int):
+    import plotly
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'plotly': plotly.__version__,
+        'repeat': repeat,
+    }
+
+
+def run(sizes, repeat: int):
+    """One result row per (size, stage)."""
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            bars = PERIOD_BARS[size]
+            history = synthetic_history(bars, seed=bars)
+            period = PROVIDER_PERIODS.get(size, size)
+
+            # The forecast prints when it falls back to a trend line (short histories)
+            with contextlib.redirect_stdout(io.StringIO()):
+                stages = provider_stages(history, period, repeat, workdir)
+                stages.update(compute_stages(history, repeat))
+            for stage, result in stages.items():
+                rows.append(dict(size=size, bars=bars, stage=stage, **result))
+            print(f"{size}: {len(stages)} stages", file=sys.stderr)
+    return rows
+
+
+def print_table(rows):
+    print(f"{'size':>5} {'stage':<28} {'best ms':>9} {'median ms':>10} {'peak KB':>9}")
+    for row in rows:
+        print(f"{row['size']:>5} {row['stage']:<28} {row['best_ms']:>9.3f} "
+              f"{row['median_ms']:>10.3f} {row['peak_kb']:>9.1f}")
+
+
+def compare(rows, baseline_path: str, tolerance: float):
+    """Print the stages whose best time grew by more than ``tolerance``; return how many."""
+    with open(baseline_path, 'r') as f:
+        baseline = {(row['size'], row['stage']): row for row in json.load(f)['results']}
+
+    regressions = 0
+    for row in rows:
+        before = baseline.get((row['size'], row['stage']))
+        if before is None or max(before['best_ms'], row['best_ms']) < COMPARE_FLOOR_MS:
+            continue
+        ratio = row['best_ms'] / before['best_ms']
+        if ratio > tolerance:
+            regressions += 1
+            print(f"REGRESSION {row['size']:>5} {row['stage']:<28} "
+                  f"{before['best_ms']:.3f} -> {row['best_ms']:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data -> indicators -> forecast -> figure pipeline.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage")
+    parser.add_argument("--sizes", nargs='+', choices=list(PERIOD_BARS), default=list(PERIOD_BARS),
+                        help="History sizes to run")
+    parser.add_argument("--output", default="bench_pipeline.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=1.2,
+                        help="Slowdown ratio over the baseline reported as a regression")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.repeat)
+    print_table(rows)
+
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(args.repeat), 'results': rows}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare and compare(rows, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Checks the watchlist screener against per-ticker indicators and forecasts,
+and times it against screening the same tickers one at a time.
+
+    python -m benchmarks.bench_screener [--tickers 500]
+"""
+import argparse
+import time
+import numpy as np
+from benchmarks.synthetic import synthetic_history, PERIOD_BARS
+from charting.charts import forecast_from_prices
+from charting.forecast import TRADING_DAYS
+from charting.indicators import compute_indicators
+from charting.screener import stack_panel, screen_panel
+
+
+def per_ticker_screen(histories):
+    """The screener metrics with the single-ticker indicator and forecast code."""
+    rows = {}
+    for ticker, history in histories.items():
+        close = history['Close'].to_numpy(dtype='float64')
+        indicators = compute_indicators(close)
+        forecasts, _ = forecast_from_prices(close, history['Volume'].to_numpy(dtype='float64'))
+        rows[ticker] = {
+            'RSI': indicators['rsi'][-1],
+            '% From 52W High': (close[-1] / history['High'].iloc[-TRADING_DAYS:].max() - 1) * 100,
+            'Forecast Return %': (forecasts[-1] / close[-1] - 1) * 100,
+        }
+    return rows
+
+
+def best_of(function, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the watchlist screener.")
+    parser.add_argument("--tickers", type=int, default=500, help="Number of synthetic tickers")
+    args = parser.parse_args()
+
+    sizes = [PERIOD_BARS[period] for period in ('6mo', '1y', '2y')]
+    histories = {f"T{i}": synthetic_history(sizes[i % len(sizes)], seed=i) for i in range(args.tickers)}
+
+    loop_time, expected = best_of(lambda: per_ticker_screen(histories))
+    panel_time, table = best_of(lambda: screen_panel(*stack_panel(histories)))
+
+    table = table.set_index('Ticker')
+    for column in ('RSI', '% From 52W High', 'Forecast Return %'):
+        reference = np.array([expected[ticker][column] for ticker in table.index])
+        assert np.allclose(table[column], reference, atol=0.01, equal_nan=True), f"{column} differs"
+
+    print(f"{args.tickers} tickers: per-ticker loop {loop_time * 1e3:.0f} ms, "
+          f"screener {panel_time * 1e3:.0f} ms ({loop_time / panel_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
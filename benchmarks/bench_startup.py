@@ -0,0 +1,93 @@
+"""
+Measures dashboard cold start in fresh interpreters: importing app_gradio,
+building the interface, and the post-launch warm-up. Also prints an import
+time breakdown by top-level package (from ``python -X importtime``).
+
+Children run in a temporary directory, so no cache directory is created in
+the repository.
+
+    python -m benchmarks.bench_startup [--repeat 3] [--top 15]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_PARTY = ('app_gradio', 'agents', 'charting', 'data', 'gemini_summarizer', 'cache_warmer')
+
+STAGES_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import app_gradio
+imported = time.perf_counter()
+interface = app_gradio.GradioInterface()
+demo, _ = interface.create_interface()
+built = time.perf_counter()
+app_gradio.warm_up(interface)
+warmed = time.perf_counter()
+print(json.dumps({
+    'import app_gradio': imported - start,
+    'build interface': built - imported,
+    'warm-up (after launch)': warmed - built,
+}))
+"""
+
+
+def _run(arguments, workdir):
+    environment = dict(os.environ, PYTHONPATH=REPO_ROOT, ANALYSIS_WORKERS="0", GEMINI_CLIENT="stub")
+    return subprocess.run([sys.executable] + arguments, cwd=workdir, env=environment,
+                          capture_output=True, text=True, check=True)
+
+
+def stage_timings(workdir, repeat):
+    """Best-of-``repeat`` seconds per startup stage."""
+    best = {}
+    for _ in range(repeat):
+        timings = json.loads(_run(['-c', STAGES_SCRIPT], workdir).stdout.strip().splitlines()[-1])
+        for stage, seconds in timings.items():
+            best[stage] = min(seconds, best.get(stage, seconds))
+    return best
+
+
+def import_breakdown(workdir):
+    """Self import time in seconds per top-level package while importing app_gradio."""
+    stderr = _run(['-X', 'importtime', '-c', 'import app_gradio'], workdir).stderr
+    per_package = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        per_package[name.strip().split('.')[0]] += int(self_us) / 1e6
+    return per_package
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard cold start.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (best is reported)")
+    parser.add_argument("--top", type=int, default=15, help="Packages shown in the import breakdown")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        timings = stage_timings(workdir, args.repeat)
+        per_package = import_breakdown(workdir)
+
+    print(f"{'stage':<26} {'seconds':>8}")
+    for stage, seconds in timings.items():
+        print(f"{stage:<26} {seconds:>8.3f}")
+    print(f"{'time to accepting requests':<26} {timings['import app_gradio'] + timings['build interface']:>8.3f}")
+
+    print(f"\n{'package (self import time)':<26} {'seconds':>8}")
+    ranked = sorted(per_package.items(), key=lambda item: item[1], reverse=True)
+    for package, seconds in ranked[:args.top]:
+        print(f"{package:<26} {seconds:>8.3f}")
+    first_party = sum(seconds for package, seconds in per_package.items() if package in FIRST_PARTY)
+    print(f"{'(first-party modules)':<26} {first_party:>8.3f}")
+    print(f"{'(total)':<26} {sum(per_package.values()):>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
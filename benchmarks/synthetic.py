@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+# Trading days per period, roughly matching yfinance daily history sizes
+PERIOD_BARS = {
+    '1mo': 21,
+    '3mo': 63,
+    '6mo': 126,
+    '1y': 252,
+    '2y': 504,
+    '5y': 1260,
+    '10y': 2520,
+    '30y': 7560,
+}
+
+
+def synthetic_history(bars: int, seed: int = 0, start_price: float = 100.0):
+    """
+    Random-walk daily OHLCV shaped like ``yf.Ticker.history`` output
+    (tz-aware index, Open/High/Low/Close/Volume/Dividends/Stock Splits).
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end='2024-12-31', periods=bars, tz='America/New_York', name='Date')
+
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0003, 0.015, bars)))
+    open_ = close * (1 + rng.normal(0, 0.004, bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.006, bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.006, bars)))
+    volume = rng.integers(1_000_000, 50_000_000, bars).astype('int64')
+
+    return pd.DataFrame({
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': volume,
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=index)
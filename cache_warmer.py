@@ -0,0 +1,193 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from data.data_provider import YFinanceDataProvider, BATCH_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+WATCHLIST_FILE = os.getenv("WATCHLIST_FILE", "watchlist.json")
+
+
+def load_watchlist(path: str = WATCHLIST_FILE):
+    """
+    Read the warmer configuration.
+
+    The file is JSON with a required ``tickers`` list and optional
+    ``period``, ``interval_minutes`` and ``refresh_margin_minutes`` keys.
+    """
+    with open(path, 'r') as f:
+        config = json.load(f)
+    config['tickers'] = [ticker.upper() for ticker in config.get('tickers', [])]
+    return config
+
+
+class CacheWarmer:
+    """
+    Refreshes cache entries for a watchlist before they expire, so users do
+    not pay for cold yfinance fetches inside the Gradio callback.
+
+    Each run refreshes tickers whose entry is missing or expires within
+    ``refresh_margin``, most requested first (popularity comes from the
+    provider's request counts, which every process sharing the cache
+    directory adds to). Missing tickers are fetched in one batch with
+    ``get_many``; existing ones are refreshed incrementally on a pool of
+    ``max_workers`` threads.
+    """
+
+    def __init__(self, tickers, data_provider=None, period: str = "1y",
+                 interval: datetime.timedelta = datetime.timedelta(minutes=15),
+                 refresh_margin: datetime.timedelta = datetime.timedelta(hours=1),
+                 max_workers: int = BATCH_MAX_WORKERS):
+        self.tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        self.data_provider = data_provider or YFinanceDataProvider()
+        self.period = period
+        self.interval = interval
+        self.refresh_margin = refresh_margin
+        self.max_workers = max_workers
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._status = {
+            'running': False,
+            'last_run_started': None,
+            'last_run_finished': None,
+            'due': 0,
+            'processed': 0,
+            'failed': [],
+        }
+
+    @classmethod
+    def from_config(cls, path: str = WATCHLIST_FILE, data_provider=None):
+        config = load_watchlist(path)
+        return cls(
+            config['tickers'],
+            data_provider=data_provider,
+            period=config.get('period', "1y"),
+            interval=datetime.timedelta(minutes=config.get('interval_minutes', 15)),
+            refresh_margin=datetime.timedelta(minutes=config.get('refresh_margin_minutes', 60))
+        )
+
+    def due_tickers(self):
+        """Tickers that are uncached or expire within the refresh margin, most popular first."""
+        deadline = datetime.datetime.now() + self.refresh_margin
+        popularity = self.data_provider.popularity()
+
+        due = []
+        for position, ticker in enumerate(self.tickers):
+            expires_at = self.data_provider.cache_expires_at(ticker)
+            if expires_at is None or expires_at <= deadline:
+                due.append((-popularity.get(ticker, 0), position, ticker, expires_at))
+        due.sort()
+        return [(ticker, expires_at) for _, _, ticker, expires_at in due]
+
+    def run_once(self):
+        """Refresh every due ticker once and return the resulting status."""
+        due = self.due_tickers()
+        with self._lock:
+            self._status.update(
+                last_run_started=datetime.datetime.now(),
+                due=len(due),
+                processed=0,
+                failed=[]
+            )
+
+        missing = [ticker for ticker, expires_at in due if expires_at is None]
+        if missing:
+            results, errors = self.data_provider.get_many(missing, self.period)
+            with self._lock:
+                self._status['processed'] += len(results) + len(errors)
+                self._status['failed'].extend(errors)
+
+        expired = [ticker for ticker, expires_at in due if expires_at is not None]
+        if expired:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                # Submitted in popularity order; a stop skips the ones not started yet
+                for future in [pool.submit(self._refresh, ticker) for ticker in expired]:
+                    future.result()
+
+        with self._lock:
+            self._status['last_run_finished'] = datetime.datetime.now()
+        status = self.status()
+        logger.info(
+            f"Cache warmer refreshed {status['processed']}/{status['due']} tickers, "
+            f"{len(status['failed'])} failed, lag {status['lag_seconds']:.0f}s"
+        )
+        return status
+
+    def _refresh(self, ticker: str):
+        if self._stop_event.is_set():
+            return
+        data = self.data_provider.refresh(ticker, self.period)
+        with self._lock:
+            self._status['processed'] += 1
+            if data is None:
+                self._status['failed'].append(ticker)
+
+    def lag_seconds(self):
+        """How long the most overdue watchlist entry has been expired (0 if none)."""
+        now = datetime.datetime.now()
+        lag = 0.0
+        for ticker in self.tickers:
+            expires_at = self.data_provider.cache_expires_at(ticker)
+            if expires_at is not None and expires_at < now:
+                lag = max(lag, (now - expires_at).total_seconds())
+        return lag
+
+    def status(self):
+        """Progress of the current or last run plus the current lag."""
+        with self._lock:
+            status = dict(self._status)
+            status['failed'] = list(self._status['failed'])
+        status['watchlist_size'] = len(self.tickers)
+        status['lag_seconds'] = self.lag_seconds()
+        return status
+
+    def _run_forever(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Cache warmer run failed: {e}")
+            self._stop_event.wait(self.interval.total_seconds())
+
+    def start(self):
+        """Run the warmer on a background daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        with self._lock:
+            self._status['running'] = True
+        self._thread = threading.Thread(target=self._run_forever, name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._lock:
+            self._status['running'] = False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pre-warm the stock data cache for a watchlist.")
+    parser.add_argument("--config", default=WATCHLIST_FILE, help="Path to the watchlist JSON file")
+    parser.add_argument("--once", action="store_true", help="Run a single refresh pass and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    warmer = CacheWarmer.from_config(args.config)
+    if args.once:
+        warmer.run_once()
+    else:
+        try:
+            while True:
+                warmer.run_once()
+                time.sleep(warmer.interval.total_seconds())
+        except KeyboardInterrupt:
+            pass
@@ -1,135 +1,63 @@
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from scipy import stats
+from collections import OrderedDict
+import threading
 import datetime
+from monitoring import metrics
+from charting.indicators import compute_indicators
+from charting.pivots import PRIMARY_ORDER, find_pivots, trend_lines_from_pivots
+from charting.forecast import forecast_prices, trend_forecast
+from charting.downsample import CHART_MAX_POINTS, downsample_ohlc, lttb_indices, minmax_indices
+
+# Memoized forecasts keyed by (ticker, period, last bar timestamp, bars, horizon)
+FORECAST_CACHE_SIZE = 128
+_forecast_cache = OrderedDict()
+_forecast_cache_lock = threading.Lock()
 
 def calculate_trend_lines(history: pd.DataFrame, lookback_period=50):
-    """Calculate support and resistance trend lines"""
-    prices = history['Close'].values
-    dates = np.arange(len(prices))
-
-    # Find local maxima and minima for trend lines
-    from scipy.signal import argrelextrema
-
-    # Get local maxima (resistance points)
-    local_maxima = argrelextrema(prices, np.greater, order=5)[0]
-    # Get local minima (support points)
-    local_minima = argrelextrema(prices, np.less, order=5)[0]
-
-    trend_lines = {}
-
-    if len(local_maxima) >= 2:
-        # Resistance trend line using last few peaks
-        recent_maxima = local_maxima[-3:] if len(local_maxima) >= 3 else local_maxima
-        max_dates = dates[recent_maxima]
-        max_prices = prices[recent_maxima]
-
-        if len(max_dates) >= 2:
-            resistance_slope, resistance_intercept = np.polyfit(max_dates, max_prices, 1)
-            trend_lines['resistance'] = {
-                'slope': resistance_slope,
-                'intercept': resistance_intercept,
-                'dates': max_dates,
-                'prices': max_prices
-            }
-
-    if len(local_minima) >= 2:
-        # Support trend line using last few troughs
-        recent_minima = local_minima[-3:] if len(local_minima) >= 3 else local_minima
-        min_dates = dates[recent_minima]
-        min_prices = prices[recent_minima]
-
-        if len(min_dates) >= 2:
-            support_slope, support_intercept = np.polyfit(min_dates, min_prices, 1)
-            trend_lines['support'] = {
-                'slope': support_slope,
-                'intercept': support_intercept,
-                'dates': min_dates,
-                'prices': min_prices
-            }
-
-    return trend_lines
+    """Calculate support and resistance trend lines
+
+    Resistance is fitted through recent pivot highs and support through
+    pivot lows, at each scale in PIVOT_ORDERS (see charting/pivots.py).
+    """
+    highs, lows = highs_and_lows(history)
+    return trend_lines_from_prices(highs, lows)
+
+def highs_and_lows(history: pd.DataFrame):
+    """High and Low columns as float arrays (Close for both when they are missing)"""
+    if 'High' in history.columns and 'Low' in history.columns:
+        return history['High'].to_numpy(dtype='float64'), history['Low'].to_numpy(dtype='float64')
+    prices = history['Close'].to_numpy(dtype='float64')
+    return prices, prices
+
+def trend_lines_from_prices(highs: np.ndarray, lows: np.ndarray):
+    """calculate_trend_lines on plain high/low arrays (cheap to send to a worker process)"""
+    return trend_lines_from_pivots(highs, lows, find_pivots(highs, lows))
 
 def generate_price_forecast(history: pd.DataFrame, forecast_days=15):
-    """Generate price forecast using multiple models and confidence intervals"""
+    """Generate price forecast using multiple models and confidence intervals
+
+    Model 1 is a degree-2 polynomial regression on bar number, log volume and
+    lagged closes, fitted in closed form (see charting/forecast.py).
+    """
 
     # Prepare data
     prices = history['Close'].values
     volumes = history['Volume'].values if 'Volume' in history.columns else np.ones(len(prices))
-    dates_numeric = np.arange(len(prices))
-
-    # Feature engineering
-    X = np.column_stack([
-        dates_numeric,
-        np.log(volumes + 1),  # Log volume
-        np.roll(prices, 1),   # Previous day price
-        np.roll(prices, 5),   # 5-day lag
-    ])
 
-    # Remove first 5 rows due to lag features
-    X = X[5:]
-    y = prices[5:]
-    dates_numeric = dates_numeric[5:]
+    return forecast_from_prices(prices, volumes, forecast_days)
 
-    # Remove any NaN or inf values
-    mask = np.isfinite(X).all(axis=1) & np.isfinite(y)
-    X = X[mask]
-    y = y[mask]
-    dates_numeric = dates_numeric[mask]
-
-    forecasts = []
+def forecast_from_prices(prices: np.ndarray, volumes: np.ndarray, forecast_days=15):
+    """generate_price_forecast on plain close/volume arrays (cheap to send to a worker process)"""
 
     # Model 1: Linear Regression with polynomial features
     try:
-        poly_features = PolynomialFeatures(degree=2, include_bias=False)
-        X_poly = poly_features.fit_transform(X)
-
-        model1 = LinearRegression()
-        model1.fit(X_poly, y)
-
-        # Generate future features
-        future_dates = np.arange(len(prices), len(prices) + forecast_days)
-        last_price = prices[-1]
-        last_volume = volumes[-1]
-
-        future_X = []
-        for i, future_date in enumerate(future_dates):
-            if i == 0:
-                prev_price = prices[-1]
-                lag5_price = prices[-5] if len(prices) >= 5 else prices[-1]
-            else:
-                prev_price = forecasts[-1] if forecasts else last_price
-                lag5_price = prices[-(5-i)] if (5-i) > 0 else (forecasts[i-5] if i >= 5 else last_price)
-
-            future_X.append([
-                future_date,
-                np.log(last_volume + 1),
-                prev_price,
-                lag5_price
-            ])
-
-            if i == 0:  # First prediction
-                future_X_poly = poly_features.transform([future_X[-1]])
-                pred = model1.predict(future_X_poly)[0]
-                forecasts.append(pred)
-
-        # Generate all predictions at once for remaining days
-        if len(forecasts) < forecast_days:
-            for i in range(len(forecasts), forecast_days):
-                future_X_poly = poly_features.transform([future_X[i]])
-                pred = model1.predict(future_X_poly)[0]
-                forecasts.append(pred)
+        forecasts = list(forecast_prices(prices, volumes, forecast_days))
 
     except Exception as e:
         print(f"Polynomial model failed: {e}")
         # Fallback to simple trend
-        recent_trend = np.polyfit(range(min(30, len(prices))), prices[-min(30, len(prices)):], 1)
-        for i in range(forecast_days):
-            forecasts.append(recent_trend[1] + recent_trend[0] * (len(prices) + i))
+        forecasts = list(trend_forecast(prices, forecast_days))
 
     # Calculate confidence intervals based on recent volatility
     recent_returns = np.diff(np.log(prices[-30:])) if len(prices) >= 30 else np.diff(np.log(prices))
@@ -149,25 +77,78 @@ def generate_price_forecast(history: pd.DataFrame, forecast_days=15):
 
     return forecasts, confidence_intervals
 
-def create_candlestick_chart(history: pd.DataFrame, include_forecast=True):
-    """Create enhanced candlestick chart with trend lines and forecasts"""
+def get_price_forecast(history: pd.DataFrame, ticker: str, period: str, forecast_days=15, executor=None):
+    """Memoized generate_price_forecast keyed by ticker, period and last bar
+
+    The last bar's close and volume are part of the key: a refresh can
+    replace the last bar in place, keeping its timestamp and the bar count.
+    Repeated calls for the same history reuse the fitted result instead of
+    refitting the model. The returned lists must not be mutated. With an
+    ``executor`` (ComputeExecutor), a cache miss is computed in a worker
+    process.
+    """
+    last_bar = history.iloc[-1]
+    key = (
+        ticker.upper(), period, history.index[-1], len(history), forecast_days,
+        float(last_bar['Close']), float(last_bar['Volume']) if 'Volume' in history.columns else None
+    )
 
-    fig = go.Figure()
+    with _forecast_cache_lock:
+        if key in _forecast_cache:
+            _forecast_cache.move_to_end(key)
+            metrics.record_cache('forecast', True)
+            return _forecast_cache[key]
+    metrics.record_cache('forecast', False)
+
+    with metrics.timed('forecast'):
+        if executor is None:
+            result = generate_price_forecast(history, forecast_days=forecast_days)
+        else:
+            prices = history['Close'].to_numpy(dtype='float64')
+            volumes = history['Volume'].to_numpy(dtype='float64') if 'Volume' in history.columns else np.ones(len(prices))
+            result = executor.run(forecast_from_prices, prices, volumes, forecast_days)
+
+    with _forecast_cache_lock:
+        _forecast_cache[key] = result
+        _forecast_cache.move_to_end(key)
+        while len(_forecast_cache) > FORECAST_CACHE_SIZE:
+            _forecast_cache.popitem(last=False)
+
+    return result
+
+@metrics.timed('figure_candlestick')
+def create_candlestick_chart(history: pd.DataFrame, include_forecast=True, forecast=None, trend_lines=None,
+                             max_points=CHART_MAX_POINTS):
+    """Create enhanced candlestick chart with trend lines and forecasts
+
+    Pass a precomputed ``forecast`` (forecasts, confidence_intervals) tuple
+    and/or ``trend_lines`` dict to reuse them instead of computing them again.
+    Long histories are drawn as weekly or monthly candles so that at most
+    ``max_points`` candles are sent to the browser.
+    """
+    # Plotly is loaded on first use (or by the startup warm-up), not at import
+    from charting.figures import timestamps_ms, candlestick_figure
+
+    dates = timestamps_ms(history.index)
+    traces = []
 
     # Add candlestick chart
-    fig.add_trace(go.Candlestick(
-        x=history.index,
-        open=history['Open'],
-        high=history['High'],
-        low=history['Low'],
-        close=history['Close'],
+    candles = downsample_ohlc(history, max_points)
+    traces.append(dict(
+        type='candlestick',
+        x=timestamps_ms(candles.index),
+        open=candles['Open'].to_numpy(dtype='float64'),
+        high=candles['High'].to_numpy(dtype='float64'),
+        low=candles['Low'].to_numpy(dtype='float64'),
+        close=candles['Close'].to_numpy(dtype='float64'),
         name="OHLC",
-        increasing_line_color='#00ff88',
-        decreasing_line_color='#ff4444'
+        increasing=dict(line=dict(color='#00ff88')),
+        decreasing=dict(line=dict(color='#ff4444'))
     ))
 
     # Calculate and add trend lines
-    trend_lines = calculate_trend_lines(history)
+    if trend_lines is None:
+        trend_lines = calculate_trend_lines(history)
 
     if 'resistance' in trend_lines:
         resistance = trend_lines['resistance']
@@ -177,9 +158,10 @@ def create_candlestick_chart(history: pd.DataFrame, include_forecast=True):
         start_price = resistance['slope'] * start_idx + resistance['intercept']
         end_price = resistance['slope'] * end_idx + resistance['intercept']
 
-        fig.add_trace(go.Scatter(
-            x=[history.index[start_idx], history.index[end_idx]],
-            y=[start_price, end_price],
+        traces.append(dict(
+            type='scatter',
+            x=dates[[start_idx, end_idx]],
+            y=np.array([start_price, end_price]),
             mode='lines',
             line=dict(color='red', width=2, dash='dash'),
             name='Resistance Trend',
@@ -194,30 +176,56 @@ def create_candlestick_chart(history: pd.DataFrame, include_forecast=True):
         start_price = support['slope'] * start_idx + support['intercept']
         end_price = support['slope'] * end_idx + support['intercept']
 
-        fig.add_trace(go.Scatter(
-            x=[history.index[start_idx], history.index[end_idx]],
-            y=[start_price, end_price],
+        traces.append(dict(
+            type='scatter',
+            x=dates[[start_idx, end_idx]],
+            y=np.array([start_price, end_price]),
             mode='lines',
             line=dict(color='green', width=2, dash='dash'),
             name='Support Trend',
             showlegend=True
         ))
 
+    # Longer-scale levels, hidden until toggled in the legend
+    for order, lines in trend_lines.get('scales', {}).items():
+        if order == PRIMARY_ORDER:
+            continue
+        start_idx = max(0, len(history) - 100 * order // PRIMARY_ORDER)
+        end_idx = len(history) - 1
+        for kind, color in (('resistance', 'red'), ('support', 'green')):
+            if kind not in lines:
+                continue
+            line = lines[kind]
+            traces.append(dict(
+                type='scatter',
+                x=dates[[start_idx, end_idx]],
+                y=np.array([line['slope'] * start_idx + line['intercept'], line['slope'] * end_idx + line['intercept']]),
+                mode='lines',
+                line=dict(color=color, width=1, dash='dot'),
+                name=f'{kind.title()} ({order}-bar pivots)',
+                visible='legendonly',
+                showlegend=True
+            ))
+
     # Add price forecast if requested
     if include_forecast:
         try:
-            forecasts, confidence_intervals = generate_price_forecast(history)
+            if forecast is None:
+                forecast = generate_price_forecast(history)
+            forecasts, confidence_intervals = forecast
+            forecasts = np.asarray(forecasts, dtype='float64')
 
             # Create future dates
             last_date = history.index[-1]
-            future_dates = pd.date_range(
+            future_dates = timestamps_ms(pd.date_range(
                 start=last_date + pd.Timedelta(days=1),
                 periods=len(forecasts),
                 freq='D'
-            )
+            ))
 
             # Add median forecast line
-            fig.add_trace(go.Scatter(
+            traces.append(dict(
+                type='scatter',
                 x=future_dates,
                 y=forecasts,
                 mode='lines',
@@ -227,12 +235,13 @@ def create_candlestick_chart(history: pd.DataFrame, include_forecast=True):
             ))
 
             # Add confidence interval area
-            upper_bounds = [ci['upper'] for ci in confidence_intervals]
-            lower_bounds = [ci['lower'] for ci in confidence_intervals]
+            upper_bounds = np.array([ci['upper'] for ci in confidence_intervals], dtype='float64')
+            lower_bounds = np.array([ci['lower'] for ci in confidence_intervals], dtype='float64')
 
-            fig.add_trace(go.Scatter(
-                x=list(future_dates) + list(future_dates[::-1]),
-                y=upper_bounds + lower_bounds[::-1],
+            traces.append(dict(
+                type='scatter',
+                x=np.concatenate([future_dates, future_dates[::-1]]),
+                y=np.concatenate([upper_bounds, lower_bounds[::-1]]),
                 fill='toself',
                 fillcolor='rgba(255, 165, 0, 0.3)',
                 line=dict(color='rgba(255, 165, 0, 0)'),
@@ -241,9 +250,10 @@ def create_candlestick_chart(history: pd.DataFrame, include_forecast=True):
             ))
 
             # Add connection line from last historical price to first forecast
-            fig.add_trace(go.Scatter(
-                x=[history.index[-1], future_dates[0]],
-                y=[history['Close'].iloc[-1], forecasts[0]],
+            traces.append(dict(
+                type='scatter',
+                x=np.array([dates[-1], future_dates[0]]),
+                y=np.array([history['Close'].iloc[-1], forecasts[0]], dtype='float64'),
                 mode='lines',
                 line=dict(color='orange', width=2, dash='dot'),
                 showlegend=False
@@ -252,126 +262,98 @@ def create_candlestick_chart(history: pd.DataFrame, include_forecast=True):
         except Exception as e:
             print(f"Forecast generation failed: {e}")
 
-    # Update layout
-    fig.update_layout(
-        title={
-            'text': 'Enhanced Candlestick Chart with Trend Lines and Forecast',
-            'x': 0.5,
-            'font': {'size': 18}
-        },
-        xaxis_title='Date',
-        yaxis_title='Price ($)',
-        template='plotly_dark',
-        height=700,
-        showlegend=True,
-        legend=dict(
-            yanchor="top",
-            y=0.99,
-            xanchor="left",
-            x=0.01,
-            bgcolor="rgba(0,0,0,0.5)"
-        ),
-        xaxis=dict(
-            rangeslider=dict(visible=False),
-            type='date'
-        ),
-        yaxis=dict(
-            fixedrange=False
-        )
-    )
+    # Layout (title, dark template, legend, axes) is prebuilt once in charting/figures.py
+    return candlestick_figure(traces)
+
+def calculate_technical_indicators(history: pd.DataFrame):
+    """Calculate RSI, EMA 12/26, MACD, signal line and MACD histogram as NumPy arrays"""
+    return compute_indicators(history['Close'].to_numpy(dtype='float64'))
+
+def _downsampled(dates, values, max_points, select=lttb_indices):
+    """x and y of a trace reduced to about ``max_points`` points by ``select``"""
+    values = np.asarray(values, dtype='float64')
+    keep = select(values, max_points)
+    return dict(x=dates[keep], y=values[keep])
+
+@metrics.timed('figure_indicators')
+def create_technical_indicators_chart(history: pd.DataFrame, indicators=None, max_points=CHART_MAX_POINTS):
+    """Create technical indicators visualization (RSI and MACD) - Enhanced version
+
+    Pass precomputed ``indicators`` (arrays from calculate_technical_indicators
+    or IndicatorStore, aligned with ``history``) to avoid recalculating them.
+    Indicators are computed on every bar, then each line is reduced to
+    ``max_points`` with LTTB and the histogram with per-bucket min/max.
+    """
+    from charting.figures import timestamps_ms, indicators_figure, sign_colors, PRICE_AXES, RSI_AXES, MACD_AXES
+    dates = timestamps_ms(history.index)
+    prices = history['Close']
 
-    return fig
+    if indicators is None:
+        indicators = calculate_technical_indicators(history)
 
-def create_technical_indicators_chart(history: pd.DataFrame):
-    """Create technical indicators visualization (RSI and MACD) - Enhanced version"""
-    dates = history.index
-    prices = history['Close']
+    rsi = indicators['rsi']
+    exp1 = indicators['ema12']
+    exp2 = indicators['ema26']
+    macd = indicators['macd']
+    signal = indicators['signal']
+    histogram = indicators['histogram']
 
-    # Calculate RSI
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-
-    # Calculate MACD
-    exp1 = prices.ewm(span=12, adjust=False).mean()
-    exp2 = prices.ewm(span=26, adjust=False).mean()
-    macd = exp1 - exp2
-    signal = macd.ewm(span=9, adjust=False).mean()
-    histogram = macd - signal
-
-    # Create figure with subplots
-    fig = make_subplots(
-        rows=3, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.03,
-        subplot_titles=('Price with Moving Averages', 'RSI', 'MACD'),
-        row_heights=[0.5, 0.25, 0.25]
-    )
+    traces = []
 
     # Add price and moving averages in top subplot
-    fig.add_trace(go.Scatter(
-        x=dates, y=prices,
+    traces.append(dict(
+        type='scatter', **PRICE_AXES,
+        **_downsampled(dates, prices, max_points),
         name='Close Price',
         line=dict(color='#1f77b4', width=2)
-    ), row=1, col=1)
+    ))
 
-    fig.add_trace(go.Scatter(
-        x=dates, y=exp1,
+    traces.append(dict(
+        type='scatter', **PRICE_AXES,
+        **_downsampled(dates, exp1, max_points),
         name='EMA 12',
         line=dict(color='orange', width=1)
-    ), row=1, col=1)
+    ))
 
-    fig.add_trace(go.Scatter(
-        x=dates, y=exp2,
+    traces.append(dict(
+        type='scatter', **PRICE_AXES,
+        **_downsampled(dates, exp2, max_points),
         name='EMA 26',
         line=dict(color='red', width=1)
-    ), row=1, col=1)
+    ))
 
     # Add RSI
-    fig.add_trace(go.Scatter(
-        x=dates, y=rsi,
+    traces.append(dict(
+        type='scatter', **RSI_AXES,
+        **_downsampled(dates, rsi, max_points),
         name='RSI',
         line=dict(color='purple', width=2)
-    ), row=2, col=1)
+    ))
 
     # Add MACD
-    fig.add_trace(go.Scatter(
-        x=dates, y=macd,
+    traces.append(dict(
+        type='scatter', **MACD_AXES,
+        **_downsampled(dates, macd, max_points),
         name='MACD',
         line=dict(color='blue', width=2)
-    ), row=3, col=1)
+    ))
 
-    fig.add_trace(go.Scatter(
-        x=dates, y=signal,
+    traces.append(dict(
+        type='scatter', **MACD_AXES,
+        **_downsampled(dates, signal, max_points),
         name='Signal',
         line=dict(color='red', width=2)
-    ), row=3, col=1)
+    ))
 
     # Add MACD histogram
-    colors = ['green' if val >= 0 else 'red' for val in histogram]
-    fig.add_trace(go.Bar(
-        x=dates, y=histogram,
+    bars = _downsampled(dates, histogram, max_points, select=minmax_indices)
+    traces.append(dict(
+        type='bar', **MACD_AXES,
+        **bars,
         name='MACD Histogram',
-        marker_color=colors,
+        marker=sign_colors(bars['y']),
         opacity=0.6
-    ), row=3, col=1)
-
-    # Add RSI reference lines
-    fig.add_hline(y=70, line_dash="dash", line_color="red", row=2, col=1)
-    fig.add_hline(y=30, line_dash="dash", line_color="green", row=2, col=1)
-    fig.add_hline(y=50, line_dash="dot", line_color="gray", row=2, col=1)
-
-    # Add MACD zero line
-    fig.add_hline(y=0, line_dash="solid", line_color="gray", row=3, col=1)
-
-    # Update layout
-    fig.update_layout(
-        height=800,
-        showlegend=True,
-        title_text="Advanced Technical Indicators",
-        template='plotly_dark'
-    )
+    ))
 
-    return fig
\ No newline at end of file
+    # Subplots, RSI/MACD reference lines and layout are prebuilt once in charting/figures.py
+    return indicators_figure(traces)
@@ -0,0 +1,120 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Points per trace sent to the browser, about the pixel width of a chart
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "1000"))
+
+# Candle aggregation levels tried in order until the bar count fits
+CANDLE_FREQUENCIES = ('D', 'W', 'M')
+
+
+def lttb_indices(y: np.ndarray, threshold: int = CHART_MAX_POINTS):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; in between, each of
+    ``threshold - 2`` equal buckets contributes the point forming the largest
+    triangle with the previously kept point and the next bucket's average,
+    which preserves peaks and troughs. Points are assumed evenly spaced (one
+    per bar) and NaNs are skipped.
+    """
+    y = np.asarray(y, dtype='float64')
+    finite = np.flatnonzero(np.isfinite(y))
+    if len(finite) <= max(threshold, 2):
+        return finite
+    values = y[finite]
+    x = finite.astype('float64')
+    n = len(values)
+
+    # Bucket b covers [edges[b], edges[b + 1]) of the points between the first and last
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    average_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    average_y = np.add.reduceat(values[:-1], edges[:-1]) / counts
+    # The bucket after the last one is the final point
+    average_x = np.append(average_x[1:], x[-1])
+    average_y = np.append(average_y[1:], values[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        areas = np.abs(
+            (x[a] - average_x[bucket]) * (values[start:end] - values[a])
+            - (x[a] - x[start:end]) * (average_y[bucket] - values[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[bucket + 1] = a
+    return finite[selected]
+
+
+def minmax_indices(y: np.ndarray, threshold: int = CHART_MAX_POINTS):
+    """
+    Indices of the minimum and maximum of each of ``threshold // 2`` equal
+    buckets, in order. Suited to bars, where every extreme should stay
+    visible.
+    """
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    buckets = max(threshold // 2, 1)
+    if n <= threshold:
+        return np.arange(n)
+
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    grid = padded.reshape(buckets, size)
+    # All-NaN buckets (only possible at the start of an indicator) fall back to their first bar
+    filled = np.where(np.isnan(grid), -np.inf, grid)
+    highs = np.argmax(filled, axis=1)
+    filled = np.where(np.isnan(grid), np.inf, grid)
+    lows = np.argmin(filled, axis=1)
+
+    offsets = np.arange(buckets) * size
+    indices = np.unique(np.concatenate([offsets + highs, offsets + lows]))
+    return indices[indices < n]
+
+
+def _period_keys(index: pd.DatetimeIndex, frequency: str):
+    if frequency == 'W':
+        # Monday of each bar's week, in the index's own timezone
+        monday = index.normalize() - pd.to_timedelta(index.dayofweek, unit='D')
+        return monday.as_unit('ns').asi8
+    return np.asarray(index.year * 12 + index.month)
+
+
+def resample_ohlc(history: pd.DataFrame, frequency: str):
+    """
+    Aggregate daily bars to weekly ('W') or monthly ('M') candles.
+
+    Each candle is stamped with the date of its last daily bar, so the last
+    candle still ends on the latest bar.
+    """
+    index = pd.DatetimeIndex(history.index)
+    keys = _period_keys(index, frequency)
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+    ends = np.append(starts[1:], len(history)) - 1
+
+    columns = {
+        'Open': history['Open'].to_numpy(dtype='float64')[starts],
+        'High': np.maximum.reduceat(history['High'].to_numpy(dtype='float64'), starts),
+        'Low': np.minimum.reduceat(history['Low'].to_numpy(dtype='float64'), starts),
+        'Close': history['Close'].to_numpy(dtype='float64')[ends],
+    }
+    if 'Volume' in history.columns:
+        columns['Volume'] = np.add.reduceat(history['Volume'].to_numpy(dtype='float64'), starts)
+    return pd.DataFrame(columns, index=index[ends])
+
+
+def downsample_ohlc(history: pd.DataFrame, max_points: int = CHART_MAX_POINTS):
+    """``history`` as daily, weekly or monthly candles: the finest that fits in ``max_points``."""
+    if len(history) <= max_points:
+        return history
+    for frequency in CANDLE_FREQUENCIES[1:]:
+        candles = resample_ohlc(history, frequency)
+        if len(candles) <= max_points:
+            return candles
+    return candles
@@ -0,0 +1,129 @@
+import copy
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+# Trace types used by the dashboard; other trace defaults are dropped from the template
+TRACE_TYPES = ('scatter', 'bar', 'candlestick')
+
+# Axis references of the indicator chart rows (price, RSI, MACD)
+PRICE_AXES = dict(xaxis='x', yaxis='y')
+RSI_AXES = dict(xaxis='x2', yaxis='y2')
+MACD_AXES = dict(xaxis='x3', yaxis='y3')
+
+
+def timestamps_ms(index):
+    """
+    Dates as float64 milliseconds of wall-clock time, which Plotly plots on a
+    date axis and serializes as a typed array instead of ISO strings.
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit('ms').asi8.astype('float64')
+
+
+@lru_cache(maxsize=None)
+def _dark_template():
+    """plotly_dark with only the trace defaults of TRACE_TYPES."""
+    template = pio.templates['plotly_dark'].to_plotly_json()
+    template['data'] = {name: value for name, value in template['data'].items() if name in TRACE_TYPES}
+    return template
+
+
+@lru_cache(maxsize=None)
+def _candlestick_layout():
+    fig = go.Figure()
+    fig.update_layout(
+        title={
+            'text': 'Enhanced Candlestick Chart with Trend Lines and Forecast',
+            'x': 0.5,
+            'font': {'size': 18}
+        },
+        xaxis_title='Date',
+        yaxis_title='Price ($)',
+        template=_dark_template(),
+        height=700,
+        showlegend=True,
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.01,
+            bgcolor="rgba(0,0,0,0.5)"
+        ),
+        xaxis=dict(
+            rangeslider=dict(visible=False),
+            type='date'
+        ),
+        yaxis=dict(
+            fixedrange=False
+        )
+    )
+    return fig.layout.to_plotly_json()
+
+
+@lru_cache(maxsize=None)
+def _indicators_layout():
+    fig = make_subplots(
+        rows=3, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        subplot_titles=('Price with Moving Averages', 'RSI', 'MACD'),
+        row_heights=[0.5, 0.25, 0.25]
+    )
+
+    # RSI reference lines
+    fig.add_hline(y=70, line_dash="dash", line_color="red", row=2, col=1)
+    fig.add_hline(y=30, line_dash="dash", line_color="green", row=2, col=1)
+    fig.add_hline(y=50, line_dash="dot", line_color="gray", row=2, col=1)
+
+    # MACD zero line
+    fig.add_hline(y=0, line_dash="solid", line_color="gray", row=3, col=1)
+
+    fig.update_xaxes(type='date')
+    fig.update_layout(
+        height=800,
+        showlegend=True,
+        title_text="Advanced Technical Indicators",
+        template=_dark_template()
+    )
+    return fig.layout.to_plotly_json()
+
+
+def prebuild_layouts():
+    """Build and cache both layouts now (e.g. during startup warm-up) instead of on the first request."""
+    _candlestick_layout()
+    _indicators_layout()
+
+
+def _figure(layout: dict, traces: list):
+    # The layout was validated when it was built and trace dicts are written
+    # against the Plotly schema, so skip the (slow) per-request validation
+    return go.Figure(data=traces, layout=copy.deepcopy(layout), _validate=False)
+
+
+def candlestick_figure(traces: list):
+    """Candlestick chart figure with the prebuilt layout and ``traces`` (plain trace dicts)."""
+    return _figure(_candlestick_layout(), traces)
+
+
+def indicators_figure(traces: list):
+    """
+    Three-row indicator figure (price, RSI, MACD) with the prebuilt layout
+    and reference lines. Place traces with PRICE_AXES / RSI_AXES / MACD_AXES.
+    """
+    return _figure(_indicators_layout(), traces)
+
+
+def sign_colors(values: np.ndarray, positive: str = 'green', negative: str = 'red'):
+    """Marker colors by sign as a uint8 typed array plus a two-color scale."""
+    return dict(
+        color=(np.asarray(values) >= 0).astype(np.uint8),
+        colorscale=[[0, negative], [1, positive]],
+        cmin=0,
+        cmax=1
+    )
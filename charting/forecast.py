@@ -0,0 +1,338 @@
+import numpy as np
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Lags (in bars) of the closing price used as features
+PREVIOUS_LAG = 1
+WEEKLY_LAG = 5
+
+# Singular values below this fraction of the largest are treated as zero,
+# the same cutoff as LinearRegression's default ``tol``
+LSTSQ_RCOND = 1e-6
+
+# Batch mode: tickers per batched SVD (bounds memory) and worker threads
+BATCH_CHUNK_SIZE = 64
+BATCH_MAX_WORKERS = os.cpu_count() or 1
+
+# Trading days per year and z-score of the 95% confidence interval
+TRADING_DAYS = 252
+CONFIDENCE_Z = 1.96
+
+# Closes whose daily log returns set the forecast's volatility (as for the confidence interval)
+VOLATILITY_WINDOW = 30
+# A forecast that moves more than this many daily standard deviations (scaled
+# by sqrt of the horizon) from the last close is a diverged recursion, not a prediction
+MAX_FORECAST_SIGMAS = 6.0
+# Volatility floor, so very quiet series still get a usable bound
+MIN_DAILY_VOLATILITY = 0.005
+
+
+def build_training_set(prices: np.ndarray, volumes: np.ndarray):
+    """
+    Features and targets of the forecast model.
+
+    Features per bar: bar number, log volume, previous close and the close
+    five bars earlier. The first five bars (no lag available) and rows with
+    NaN or inf values are dropped.
+    """
+    dates_numeric = np.arange(len(prices), dtype='float64')
+    X = np.column_stack([
+        dates_numeric,
+        np.log(volumes + 1),                  # Log volume
+        np.roll(prices, PREVIOUS_LAG),        # Previous day price
+        np.roll(prices, WEEKLY_LAG),          # 5-day lag
+    ])
+
+    X = X[WEEKLY_LAG:]
+    y = prices[WEEKLY_LAG:]
+
+    mask = np.isfinite(X).all(axis=1) & np.isfinite(y)
+    return X[mask], y[mask]
+
+
+def polynomial_features(X: np.ndarray):
+    """
+    Degree-2 polynomial expansion without bias, in the same column order as
+    sklearn's PolynomialFeatures: the inputs, then every product x_i * x_j
+    with i <= j.
+    """
+    rows, cols = np.triu_indices(X.shape[1])
+    return np.hstack([X, X[:, rows] * X[:, cols]])
+
+
+def fit_least_squares(design: np.ndarray, y: np.ndarray):
+    """
+    Ordinary least squares with an intercept, solved the same way as
+    sklearn's LinearRegression: center the columns, then minimum-norm lstsq
+    with the LSTSQ_RCOND cutoff.
+
+    Returns (coefficients, intercept).
+    """
+    design_mean = design.mean(axis=0)
+    y_mean = y.mean()
+    coef, _, _, _ = np.linalg.lstsq(design - design_mean, y - y_mean, rcond=LSTSQ_RCOND)
+    intercept = y_mean - design_mean @ coef
+    return coef, intercept
+
+
+def recursive_forecast(coef: np.ndarray, intercept: float, prices: np.ndarray,
+                       volumes: np.ndarray, forecast_days: int = 15):
+    """
+    Roll the fitted model forward ``forecast_days`` bars.
+
+    Each step feeds the previous forecasts back in as the lagged prices; the
+    volume is held at its last value. The degree-2 model is evaluated as
+    ``intercept + b @ z + z @ Q @ z`` so each step is a couple of small dot
+    products instead of a full predict call.
+    """
+    n_features = 4
+    linear = coef[:n_features]
+    quadratic = np.zeros((n_features, n_features))
+    rows, cols = np.triu_indices(n_features)
+    quadratic[rows, cols] = coef[n_features:]
+
+    # Closing prices extended with the forecasts as they are produced
+    extended = np.empty(len(prices) + forecast_days)
+    extended[:len(prices)] = prices
+    log_volume = np.log(volumes[-1] + 1)
+
+    # A diverging recursion can overflow to inf; forecast_prices rejects the result
+    with np.errstate(over='ignore', invalid='ignore'):
+        for step in range(forecast_days):
+            position = len(prices) + step
+            lag_index = position - WEEKLY_LAG
+            z = np.array([
+                position,
+                log_volume,
+                extended[position - PREVIOUS_LAG],
+                extended[lag_index] if lag_index >= 0 else prices[-1],
+            ])
+            extended[position] = intercept + linear @ z + z @ quadratic @ z
+
+    return extended[len(prices):]
+
+
+def plausible_forecasts(prices: np.ndarray, forecasts: np.ndarray):
+    """
+    Which forecasts look like predictions rather than a diverged recursion.
+
+    ``prices`` is (bars x tickers) with NaN padding, or a single series;
+    ``forecasts`` is (tickers x days), or a single row. A forecast is
+    rejected when any value is non-finite or non-positive, or when it moves
+    more than MAX_FORECAST_SIGMAS daily standard deviations (times the
+    square root of the horizon) from the last close. The daily volatility
+    comes from the last VOLATILITY_WINDOW closes.
+    """
+    prices = np.asarray(prices, dtype='float64')
+    forecasts = np.asarray(forecasts, dtype='float64')
+    single = prices.ndim == 1
+    if single:
+        prices, forecasts = prices[:, None], forecasts[None, :]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.diff(np.log(prices[-VOLATILITY_WINDOW:]), axis=0)
+        volatility = np.fmax(np.nanstd(returns, axis=0), MIN_DAILY_VOLATILITY)
+        bound = MAX_FORECAST_SIGMAS * volatility[:, None] * np.sqrt(np.arange(1, forecasts.shape[1] + 1))[None, :]
+        moves = np.abs(np.log(forecasts / prices[-1][:, None]))
+        plausible = (np.isfinite(forecasts) & (forecasts > 0) & (moves <= bound)).all(axis=1)
+    return plausible[0] if single else plausible
+
+
+def forecast_prices(prices: np.ndarray, volumes: np.ndarray, forecast_days: int = 15):
+    """Fit the degree-2 polynomial regression and return ``forecast_days`` predicted closes."""
+    prices = np.asarray(prices, dtype='float64')
+    volumes = np.asarray(volumes, dtype='float64')
+
+    X, y = build_training_set(prices, volumes)
+    if len(y) == 0:
+        raise ValueError("No usable rows to fit the forecast model")
+
+    coef, intercept = fit_least_squares(polynomial_features(X), y)
+    forecasts = recursive_forecast(coef, intercept, prices, volumes, forecast_days)
+    if not plausible_forecasts(prices, forecasts):
+        raise ValueError("Forecast model diverged (non-finite, non-positive or implausibly large values)")
+    return forecasts
+
+
+def trend_forecast(prices: np.ndarray, forecast_days: int = 15):
+    """Fallback forecast: linear trend of the last 30 closes."""
+    window = min(30, len(prices))
+    recent_trend = np.polyfit(range(window), prices[-window:], 1)
+    # Continue the line from the end of the fitted window
+    return np.array([recent_trend[1] + recent_trend[0] * (window + i) for i in range(forecast_days)])
+
+
+def _shift(values: np.ndarray, lag: int):
+    shifted = np.full_like(values, np.nan)
+    shifted[lag:] = values[:-lag]
+    return shifted
+
+
+def _fit_batch(prices: np.ndarray, volumes: np.ndarray, starts: np.ndarray):
+    """
+    Fit the forecast model for every column of a right-aligned (bars x tickers)
+    panel at once.
+
+    Rows excluded by the single-ticker path (the first five bars of each
+    series and non-finite rows) are zeroed after centering, which leaves the
+    least-squares solution unchanged. The solve is a batched QR followed by
+    an SVD of the small triangular factor, with the same rank cutoff as
+    fit_least_squares.
+
+    Returns (coefficients (tickers x 14), intercepts (tickers,)).
+    """
+    tickers_prices = np.ascontiguousarray(prices.T)       # tickers x bars
+    tickers, bars = tickers_prices.shape
+    positions = np.arange(bars)[None, :] - starts[:, None]
+
+    # Terms first, bars last: each per-ticker (bars x terms) matrix is then
+    # column-major, which is what LAPACK wants
+    rows, cols = np.triu_indices(4)
+    n_terms = 4 + len(rows)
+    augmented = np.empty((tickers, n_terms + 1, bars))
+    augmented[:, 0] = positions
+    augmented[:, 1] = np.log(volumes.T + 1)
+    augmented[:, 2] = _shift(tickers_prices.T, PREVIOUS_LAG).T
+    augmented[:, 3] = _shift(tickers_prices.T, WEEKLY_LAG).T
+    for term, (i, j) in enumerate(zip(rows, cols), start=4):
+        np.multiply(augmented[:, i], augmented[:, j], out=augmented[:, term])
+    augmented[:, n_terms] = tickers_prices
+
+    valid = (positions >= WEEKLY_LAG) & np.isfinite(augmented).all(axis=1)
+    excluded = np.broadcast_to(~valid[:, None, :], augmented.shape)
+    np.copyto(augmented, 0.0, where=excluded)
+    counts = valid.sum(axis=1)
+
+    means = augmented.sum(axis=2) / counts[:, None]
+    augmented -= means[:, :, None]
+    np.copyto(augmented, 0.0, where=excluded)
+
+    # QR of [design | targets] reduces each problem to a small triangle with
+    # the same singular values as the design, then SVD that small system
+    triangle = np.linalg.qr(augmented.transpose(0, 2, 1), mode='r')
+    u, singular, vt = np.linalg.svd(triangle[:, :n_terms, :n_terms])
+    cutoff = LSTSQ_RCOND * singular[:, :1]
+    inverse = np.where(singular > cutoff, 1.0 / np.where(singular > 0, singular, 1.0), 0.0)
+    projected = np.einsum('nkt,nk->nt', u, triangle[:, :n_terms, n_terms]) * inverse
+    coef = np.einsum('nkj,nk->nj', vt, projected)
+    intercept = means[:, n_terms] - np.einsum('nj,nj->n', means[:, :n_terms], coef)
+    return coef, intercept
+
+
+def _recursive_forecast_batch(coef, intercept, prices, volumes, forecast_days):
+    """recursive_forecast for every ticker at once; one vectorized step per forecast day."""
+    n_features = 4
+    tickers = prices.shape[1]
+    linear = coef[:, :n_features]
+    quadratic = np.zeros((tickers, n_features, n_features))
+    rows, cols = np.triu_indices(n_features)
+    quadratic[:, rows, cols] = coef[:, n_features:]
+
+    lengths = np.isfinite(prices).sum(axis=0)
+    extended = np.vstack([prices, np.empty((forecast_days, tickers))])
+    log_volume = np.log(volumes[-1] + 1)
+    bars = len(prices)
+
+    with np.errstate(over='ignore', invalid='ignore'):
+        for step in range(forecast_days):
+            row = bars + step
+            z = np.stack([
+                (lengths + step).astype('float64'),
+                log_volume,
+                extended[row - PREVIOUS_LAG],
+                extended[row - WEEKLY_LAG],
+            ], axis=-1)
+            extended[row] = (
+                intercept
+                + np.einsum('nj,nj->n', linear, z)
+                + np.einsum('ni,nij,nj->n', z, quadratic, z)
+            )
+
+    return extended[bars:].T
+
+
+def _confidence_bounds_batch(prices: np.ndarray, forecasts: np.ndarray):
+    """95% bands from the annualized volatility of the last 30 closes, widening with sqrt(time)."""
+    with np.errstate(invalid='ignore'):
+        recent_returns = np.diff(np.log(prices[-30:]), axis=0)
+    volatility = np.nanstd(recent_returns, axis=0) * np.sqrt(TRADING_DAYS)
+    time_factor = np.sqrt(np.arange(1, forecasts.shape[1] + 1) / TRADING_DAYS)
+    width = forecasts * volatility[:, None] * time_factor[None, :] * CONFIDENCE_Z
+    return np.maximum(0, forecasts - width), forecasts + width
+
+
+def _forecast_chunk(prices, volumes, forecast_days):
+    starts = prices.shape[0] - np.isfinite(prices).sum(axis=0)
+    coef, intercept = _fit_batch(prices, volumes, starts)
+    forecasts = _recursive_forecast_batch(coef, intercept, prices, volumes, forecast_days)
+
+    # Same fallback as the single-ticker path for models that diverge
+    for column in np.flatnonzero(~plausible_forecasts(prices, forecasts)):
+        series = prices[:, column]
+        forecasts[column] = trend_forecast(series[np.isfinite(series)], forecast_days)
+
+    lower, upper = _confidence_bounds_batch(prices, forecasts)
+    return forecasts, lower, upper
+
+
+def forecast_batch(prices: np.ndarray, volumes: np.ndarray, forecast_days: int = 15,
+                   chunk_size: int = BATCH_CHUNK_SIZE, max_workers: int = BATCH_MAX_WORKERS):
+    """
+    Fit and roll forward the forecast model for many tickers at once.
+
+    ``prices`` and ``volumes`` are (bars x tickers) panels, right-aligned so
+    each column ends on its latest bar, with NaN padding before a shorter
+    series starts. Each column gets the same result as forecast_prices on
+    its own series. Columns are processed in chunks of ``chunk_size`` on
+    ``max_workers`` threads; NumPy's linear algebra releases the GIL, so
+    throughput scales with cores.
+
+    Returns (forecasts, lower, upper), each (tickers x forecast_days).
+    """
+    prices = np.asarray(prices, dtype='float64')
+    volumes = np.asarray(volumes, dtype='float64')
+    tickers = prices.shape[1]
+
+    # Chunk tickers of similar length together so little work goes to padding
+    lengths = np.isfinite(prices).sum(axis=0)
+    order = np.argsort(lengths, kind='stable')
+    chunks = [order[i:i + chunk_size] for i in range(0, tickers, chunk_size)]
+
+    def run(columns):
+        bars = max(int(lengths[columns].max()), 1)
+        return _forecast_chunk(prices[-bars:, columns], volumes[-bars:, columns], forecast_days)
+
+    forecasts = np.empty((tickers, forecast_days))
+    lower = np.empty((tickers, forecast_days))
+    upper = np.empty((tickers, forecast_days))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for columns, (chunk_forecasts, chunk_lower, chunk_upper) in zip(chunks, pool.map(run, chunks)):
+            forecasts[columns] = chunk_forecasts
+            lower[columns] = chunk_lower
+            upper[columns] = chunk_upper
+    return forecasts, lower, upper
+
+
+def stack_histories(histories: dict):
+    """
+    Right-align the Close and Volume columns of several histories into
+    (bars x tickers) panels for forecast_batch.
+
+    Returns (tickers, prices, volumes).
+    """
+    tickers = list(histories)
+    bars = max((len(history) for history in histories.values()), default=0)
+    prices = np.full((bars, len(tickers)), np.nan)
+    volumes = np.full((bars, len(tickers)), np.nan)
+
+    for column, ticker in enumerate(tickers):
+        history = histories[ticker]
+        length = len(history)
+        if not length:
+            continue
+        prices[bars - length:, column] = history['Close'].to_numpy(dtype='float64')
+        if 'Volume' in history.columns:
+            volumes[bars - length:, column] = history['Volume'].to_numpy(dtype='float64')
+        else:
+            volumes[bars - length:, column] = 1.0
+    return tickers, prices, volumes
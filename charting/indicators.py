@@ -0,0 +1,280 @@
+import numpy as np
+import pandas as pd
+import logging
+import threading
+import os
+from collections import OrderedDict
+from data.cache_backends import atomic_write
+
+logger = logging.getLogger(__name__)
+
+RSI_WINDOW = 14
+EMA_FAST_SPAN = 12
+EMA_SLOW_SPAN = 26
+SIGNAL_SPAN = 9
+
+INDICATOR_NAMES = ('rsi', 'ema12', 'ema26', 'macd', 'signal', 'histogram')
+
+
+def _ema(values: np.ndarray, span: int, previous=None):
+    """
+    Exponential moving average with pandas' ``adjust=False`` recurrence,
+    run in C through lfilter. ``previous`` is the EMA value before
+    ``values[0]``; when None the average is seeded with the first value.
+    Runs down the first axis, so a (bars x tickers) panel works too.
+    """
+    from scipy.signal import lfilter
+
+    alpha = 2.0 / (span + 1)
+    if previous is None:
+        previous = values[0]
+    result, _ = lfilter([alpha], [1.0, alpha - 1.0], values, axis=0, zi=[(1.0 - alpha) * previous])
+    return result
+
+
+def _rolling_mean(values: np.ndarray, window: int, prior: np.ndarray):
+    """
+    Rolling mean over ``prior`` + ``values``, returned for ``values`` only.
+
+    Positions without a full window are NaN, like pandas' rolling().mean().
+    """
+    combined = np.concatenate([prior, values])
+    sums = np.concatenate([[0.0], np.cumsum(combined)])
+    ends = np.arange(len(prior) + 1, len(combined) + 1)
+    starts = ends - window
+    means = np.full(len(values), np.nan)
+    valid = starts >= 0
+    means[valid] = (sums[ends[valid]] - sums[starts[valid]]) / window
+    return means
+
+
+def _advance(close: np.ndarray, state=None):
+    """
+    Compute indicators for ``close``, continuing from ``state`` (the
+    recurrence state after the previous bar) when given.
+
+    Returns (arrays, state after the last bar of ``close``).
+    """
+    close = np.asarray(close, dtype='float64')
+
+    if state is None:
+        delta = np.diff(close, prepend=np.nan)
+        prior_gains = prior_losses = np.empty(0)
+        ema_fast = ema_slow = signal_prev = None
+    else:
+        delta = np.diff(close, prepend=state['close'])
+        prior_gains = np.asarray(state['gains'])
+        prior_losses = np.asarray(state['losses'])
+        ema_fast, ema_slow, signal_prev = state['ema12'], state['ema26'], state['signal']
+
+    # NaN deltas count as zero, like delta.where(delta > 0, 0) in pandas
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    avg_gain = _rolling_mean(gains, RSI_WINDOW, prior_gains)
+    avg_loss = _rolling_mean(losses, RSI_WINDOW, prior_losses)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    ema12 = _ema(close, EMA_FAST_SPAN, ema_fast)
+    ema26 = _ema(close, EMA_SLOW_SPAN, ema_slow)
+    macd = ema12 - ema26
+    signal = _ema(macd, SIGNAL_SPAN, signal_prev)
+
+    arrays = {
+        'rsi': rsi,
+        'ema12': ema12,
+        'ema26': ema26,
+        'macd': macd,
+        'signal': signal,
+        'histogram': macd - signal
+    }
+    keep = RSI_WINDOW - 1
+    new_state = {
+        'close': float(close[-1]),
+        'ema12': float(ema12[-1]),
+        'ema26': float(ema26[-1]),
+        'signal': float(signal[-1]),
+        'gains': np.concatenate([prior_gains, gains])[-keep:],
+        'losses': np.concatenate([prior_losses, losses])[-keep:],
+    }
+    return arrays, new_state
+
+
+def compute_indicators(close: np.ndarray):
+    """RSI (14), EMA 12/26, MACD, signal (9) and histogram as NumPy arrays."""
+    if len(close) == 0:
+        return {name: np.empty(0) for name in INDICATOR_NAMES}
+    arrays, _ = _advance(close)
+    return arrays
+
+
+def compute_indicator_panel(close: np.ndarray):
+    """
+    compute_indicators for every column of a (bars x tickers) panel at once.
+
+    Columns are right-aligned with NaN padding before each series starts
+    (see charting/screener.py). Each column gets the same values as
+    compute_indicators on its own series, and NaN in the padding.
+    """
+    close = np.asarray(close, dtype='float64')
+    bars, columns = close.shape
+    if bars == 0:
+        return {name: np.empty((0, columns)) for name in INDICATOR_NAMES}
+    starts = np.argmax(np.isfinite(close), axis=0)
+    rows = np.arange(bars)[:, None]
+
+    # Padding repeats each series' first close: the EMAs then start from that
+    # close, as when seeded with it, and the RSI windows only see zero moves
+    filled = close[np.maximum(rows, starts), np.arange(columns)]
+
+    delta = np.diff(filled, axis=0, prepend=np.nan)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    avg_gain = np.full_like(filled, np.nan)
+    avg_loss = np.full_like(filled, np.nan)
+    for average, moves in ((avg_gain, gains), (avg_loss, losses)):
+        sums = np.concatenate([np.zeros((1, columns)), np.cumsum(moves, axis=0)])
+        average[RSI_WINDOW - 1:] = (sums[RSI_WINDOW:] - sums[:-RSI_WINDOW]) / RSI_WINDOW
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi[rows < starts + RSI_WINDOW - 1] = np.nan
+
+    ema12 = _ema(filled, EMA_FAST_SPAN)
+    ema26 = _ema(filled, EMA_SLOW_SPAN)
+    macd = ema12 - ema26
+    signal = _ema(macd, SIGNAL_SPAN)
+
+    arrays = {
+        'rsi': rsi,
+        'ema12': ema12,
+        'ema26': ema26,
+        'macd': macd,
+        'signal': signal,
+        'histogram': macd - signal
+    }
+    padding = rows < starts
+    for values in arrays.values():
+        values[padding] = np.nan
+    return arrays
+
+
+class IndicatorStore:
+    """
+    Indicator arrays per ticker, persisted next to the cached history and
+    extended incrementally.
+
+    Alongside the arrays, each entry keeps the recurrence state as of the
+    second-to-last bar. New bars are then processed from the stored last bar
+    onwards, which also picks up a last bar that was cached mid-session and
+    later finalized. Only the new tail is computed; the history is fully
+    recomputed when it no longer lines up with the stored entry.
+    """
+
+    extension = ".indicators.npz"
+    max_memory_entries = 256
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, key: str):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def _load(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                entry = {name: stored[name] for name in stored.files}
+        except Exception as e:
+            logger.error(f"Error loading indicator state {key}: {e}")
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: dict):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _save(self, key: str, entry: dict):
+        self._remember(key, entry)
+        try:
+            atomic_write(self.path(key), lambda f: np.savez(f, **entry), mode='wb')
+        except Exception as e:
+            logger.error(f"Error saving indicator state {key}: {e}")
+
+    def _aligned_prefix(self, entry: dict, stamps: np.ndarray, close: np.ndarray):
+        """
+        Position in the stored arrays of the first history bar, or None when
+        the stored entry cannot be extended to this history.
+        """
+        stored_stamps = entry['stamps']
+        if len(stored_stamps) < 2 or len(stamps) == 0:
+            return None
+
+        offset = int(np.searchsorted(stored_stamps, stamps[0]))
+        if offset >= len(stored_stamps) - 1 or stored_stamps[offset] != stamps[0]:
+            return None
+
+        # The bar before the stored last bar must be unchanged in the new history,
+        # and the history must go past it: the stored state already includes it
+        anchor = len(stored_stamps) - 2 - offset
+        if anchor >= len(stamps) - 1 or stamps[anchor] != stored_stamps[-2] or close[anchor] != entry['anchor_close']:
+            return None
+        return offset
+
+    def get(self, key: str, history: pd.DataFrame):
+        """Indicator arrays aligned with ``history``, extending the stored ones when possible."""
+        close = history['Close'].to_numpy(dtype='float64')
+        stamps = pd.DatetimeIndex(history.index).as_unit('ns').asi8
+        if len(close) < 2:
+            return compute_indicators(close)
+
+        entry = self._load(key)
+        offset = self._aligned_prefix(entry, stamps, close) if entry is not None else None
+
+        if offset is None:
+            head = {name: np.empty(0) for name in INDICATOR_NAMES}
+            state = None
+            start = 0
+        else:
+            # Reprocess from the stored last bar, which may have been finalized since
+            stored_count = len(entry['stamps'])
+            head = {name: entry[name][offset:stored_count - 1] for name in INDICATOR_NAMES}
+            state = {name: entry['state_' + name] for name in ('close', 'ema12', 'ema26', 'signal', 'gains', 'losses')}
+            start = stored_count - 1 - offset
+
+        # Advance to the second-to-last bar, keep that state, then add the last bar
+        body, anchor_state = _advance(close[start:-1], state) if start < len(close) - 1 else (None, state)
+        tail, _ = _advance(close[-1:], anchor_state)
+
+        arrays = {}
+        for name in INDICATOR_NAMES:
+            parts = [head[name]]
+            if body is not None:
+                parts.append(body[name])
+            parts.append(tail[name])
+            arrays[name] = np.concatenate(parts)
+
+        unchanged = (
+            offset == 0 and len(entry['stamps']) == len(stamps)
+            and entry['ema12'][-1] == arrays['ema12'][-1]
+        )
+        if unchanged:
+            return arrays
+
+        new_entry = {'stamps': stamps, 'anchor_close': np.float64(close[-2])}
+        new_entry.update(arrays)
+        new_entry.update({'state_' + name: np.asarray(value) for name, value in anchor_state.items()})
+        self._save(key, new_entry)
+        return arrays
@@ -0,0 +1,206 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Pivot orders (bars on each side a pivot must exceed); the first is drawn by default
+PIVOT_ORDERS = (5, 10, 20)
+PRIMARY_ORDER = PIVOT_ORDERS[0]
+# Pivots used per trend line
+TREND_LINE_PIVOTS = 3
+
+
+def _pivot_positions(values: np.ndarray, orders):
+    """
+    Positions of strict local maxima of ``values`` for every order at once.
+
+    A position is a pivot of order k when its value is greater than each of
+    the k values on either side. As with ``argrelextrema(..., mode='clip')``,
+    neighbours beyond the ends are replaced by the first/last value, so the
+    first and last bars are never pivots.
+
+    The smallest order is found with shifted whole-array comparisons. A
+    pivot of a higher order is also one of every lower order, so each larger
+    order only checks the extra neighbours of the previous order's pivots.
+    """
+    orders = sorted(orders)
+    n = len(values)
+    widest = orders[-1]
+    padded = np.pad(values, widest, mode='edge')
+
+    candidates = np.arange(n)
+    result = {}
+    checked = 0
+    for order in orders:
+        shifts = np.arange(checked + 1, order + 1)
+        if checked == 0:
+            mask = np.ones(n, dtype=bool)
+            for shift in shifts:
+                mask &= values > padded[widest - shift:widest - shift + n]
+                mask &= values > padded[widest + shift:widest + shift + n]
+            candidates = np.flatnonzero(mask)
+        else:
+            offsets = np.concatenate([-shifts, shifts])
+            neighbours = padded[candidates[:, None] + widest + offsets]
+            candidates = candidates[(values[candidates][:, None] > neighbours).all(axis=1)]
+        result[order] = candidates
+        checked = order
+    return result
+
+
+def find_pivots(highs: np.ndarray, lows: np.ndarray, orders=PIVOT_ORDERS):
+    """order -> (pivot high positions in ``highs``, pivot low positions in ``lows``)"""
+    highs = np.asarray(highs, dtype='float64')
+    lows = np.asarray(lows, dtype='float64')
+    peaks = _pivot_positions(highs, orders)
+    troughs = _pivot_positions(-lows, orders)
+    return {order: (peaks[order], troughs[order]) for order in orders}
+
+
+def _pivots_between(highs: np.ndarray, lows: np.ndarray, start: int, stop: int, orders):
+    """find_pivots restricted to positions [start, stop), computed on just the bars they depend on."""
+    widest = max(orders)
+    offset = max(0, start - widest)
+    segment = slice(offset, min(len(highs), stop + widest))
+    pivots = find_pivots(highs[segment], lows[segment], orders)
+    result = {}
+    for order, (peaks, troughs) in pivots.items():
+        peaks, troughs = peaks + offset, troughs + offset
+        result[order] = (
+            peaks[(peaks >= start) & (peaks < stop)],
+            troughs[(troughs >= start) & (troughs < stop)]
+        )
+    return result
+
+
+def _fit_line(positions: np.ndarray, prices: np.ndarray):
+    recent = positions[-TREND_LINE_PIVOTS:]
+    if len(recent) < 2:
+        return None
+    slope, intercept = np.polyfit(recent, prices[recent], 1)
+    return {
+        'slope': slope,
+        'intercept': intercept,
+        'dates': recent,
+        'prices': prices[recent]
+    }
+
+
+def trend_lines_from_pivots(highs: np.ndarray, lows: np.ndarray, pivots: dict):
+    """
+    Resistance (through the last pivot highs) and support (through the last
+    pivot lows) for every order in ``pivots``.
+
+    Returns the PRIMARY_ORDER lines under 'resistance' / 'support', as
+    calculate_trend_lines always has, and every order under 'scales'.
+    """
+    highs = np.asarray(highs, dtype='float64')
+    lows = np.asarray(lows, dtype='float64')
+    scales = {}
+    for order, (peaks, troughs) in pivots.items():
+        lines = {}
+        resistance = _fit_line(peaks, highs)
+        if resistance is not None:
+            lines['resistance'] = resistance
+        support = _fit_line(troughs, lows)
+        if support is not None:
+            lines['support'] = support
+        scales[order] = lines
+
+    trend_lines = dict(scales.get(PRIMARY_ORDER, {}))
+    trend_lines['scales'] = scales
+    return trend_lines
+
+
+class PivotStore:
+    """
+    Pivots per key (ticker and period), kept in memory and updated
+    incrementally.
+
+    A pivot of order k depends only on the k bars either side of it. When a
+    history shares its bars with the stored one (new bars appended, old bars
+    trimmed from the head), only positions within ``max(orders)`` bars of
+    either end are re-examined; pivots in between are reused.
+    """
+
+    max_entries = 128
+
+    def __init__(self, orders=PIVOT_ORDERS):
+        self.orders = tuple(orders)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _reusable(self, entry: dict, stamps: np.ndarray, highs: np.ndarray, lows: np.ndarray):
+        """
+        Offset of the first bar in the stored history when ``history`` runs
+        through the stored last bar with the same tail values, else None.
+        """
+        stored_stamps = entry['stamps']
+        tail = len(entry['tail_highs'])
+        if len(stamps) == 0:
+            return None
+        offset = int(np.searchsorted(stored_stamps, stamps[0]))
+        overlap = len(stored_stamps) - offset
+        if offset >= len(stored_stamps) or stored_stamps[offset] != stamps[0] or overlap > len(stamps):
+            return None
+        # Revised prices (splits, dividends) arrive as a full refetch, so the tail is enough to tell
+        unchanged = (
+            stamps[overlap - 1] == stored_stamps[-1]
+            and np.array_equal(highs[overlap - tail:overlap], entry['tail_highs'])
+            and np.array_equal(lows[overlap - tail:overlap], entry['tail_lows'])
+        )
+        return offset if unchanged else None
+
+    def pivots(self, key, history: pd.DataFrame):
+        """find_pivots for ``history``, reusing the stored pivots of ``key`` where possible."""
+        highs = history['High'].to_numpy(dtype='float64')
+        lows = history['Low'].to_numpy(dtype='float64')
+        # Only compared with earlier calls for the same key, so the index's own unit is fine
+        stamps = pd.DatetimeIndex(history.index).asi8
+        widest = max(self.orders)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        offset = None
+        if entry is not None and len(entry['stamps']) - 2 * widest > widest:
+            offset = self._reusable(entry, stamps, highs, lows)
+
+        if offset is None:
+            pivots = find_pivots(highs, lows, self.orders)
+        else:
+            # Middle pivots keep their full neighbourhood; only both ends are re-examined
+            middle_start, middle_stop = widest, len(entry['stamps']) - offset - widest
+            head = _pivots_between(highs, lows, 0, middle_start, self.orders)
+            tail = _pivots_between(highs, lows, middle_stop, len(highs), self.orders)
+            pivots = {}
+            for order in self.orders:
+                parts = []
+                for side in (0, 1):
+                    stored = entry['pivots'][order][side] - offset
+                    middle = stored[(stored >= middle_start) & (stored < middle_stop)]
+                    parts.append(np.concatenate([head[order][side], middle, tail[order][side]]))
+                pivots[order] = tuple(parts)
+
+        with self._lock:
+            self._entries[key] = {
+                'stamps': stamps,
+                'tail_highs': highs[-2 * widest:],
+                'tail_lows': lows[-2 * widest:],
+                'pivots': pivots
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return pivots
+
+    def trend_lines(self, key, history: pd.DataFrame):
+        """Multi-scale trend lines (see trend_lines_from_pivots) for ``history``."""
+        pivots = self.pivots(key, history)
+        return trend_lines_from_pivots(
+            history['High'].to_numpy(dtype='float64'),
+            history['Low'].to_numpy(dtype='float64'),
+            pivots
+        )
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+from charting.indicators import compute_indicator_panel
+from charting.forecast import forecast_batch, TRADING_DAYS
+
+PANEL_COLUMNS = ('High', 'Low', 'Close', 'Volume')
+
+# Shortest period loaded for the 52-week high and low, whatever the screening period
+FIFTY_TWO_WEEK_PERIOD = '1y'
+
+# A MACD/signal crossover within this many bars is reported as a fresh cross
+MACD_CROSS_LOOKBACK = 5
+
+SCREEN_COLUMNS = [
+    'Ticker', 'Price', 'RSI', 'MACD', 'Bars Since Cross',
+    '% From 52W High', '% Above 52W Low', 'Forecast Return %'
+]
+
+
+def stack_panel(histories: dict, columns=PANEL_COLUMNS):
+    """
+    Right-align several histories into one (bars x tickers) panel per column,
+    with NaN padding before a shorter series starts. A missing Volume column
+    is filled with ones (as in stack_histories) and missing High/Low with
+    the closes.
+
+    Returns (tickers, {column: panel}).
+    """
+    tickers = list(histories)
+    bars = max((len(history) for history in histories.values()), default=0)
+    panel = {column: np.full((bars, len(tickers)), np.nan) for column in columns}
+
+    for position, ticker in enumerate(tickers):
+        history = histories[ticker]
+        length = len(history)
+        if not length:
+            continue
+        for column in columns:
+            if column in history.columns:
+                values = history[column].to_numpy(dtype='float64')
+            elif column == 'Volume':
+                values = 1.0
+            else:
+                values = history['Close'].to_numpy(dtype='float64')
+            panel[column][bars - length:, position] = values
+    return tickers, panel
+
+
+def _macd_crosses(histogram: np.ndarray):
+    """Per column: whether MACD is above its signal line now, and bars since it last crossed (-1 if never)."""
+    valid = np.isfinite(histogram)
+    above = histogram > 0
+    crossed = (above[1:] != above[:-1]) & valid[1:] & valid[:-1]
+    # Position of the latest cross counted back from the last bar
+    bars_since = np.argmax(crossed[::-1], axis=0)
+    bars_since[~crossed.any(axis=0)] = -1
+    return above[-1] & valid[-1], bars_since
+
+
+def screen_panel(tickers: list, panel: dict, forecast_days: int = 15, levels: dict = None):
+    """
+    Screening metrics for every column of a panel from stack_panel, computed
+    in one vectorized pass:
+
+    - RSI (14) on the last bar
+    - MACD against its signal line, flagged as a fresh cross when it crossed
+      within MACD_CROSS_LOOKBACK bars
+    - Distance of the last close from the 52-week (TRADING_DAYS bars) high
+      and low, taken from the High and Low of ``levels`` when given (a
+      panel of the same tickers covering at least FIFTY_TWO_WEEK_PERIOD)
+      and otherwise from the panel's own
+    - Return of the ``forecast_days`` forecast (forecast_batch) over the
+      last close
+
+    Returns a DataFrame with SCREEN_COLUMNS, one row per ticker, sorted by
+    forecast return.
+    """
+    close = panel['Close']
+    last = close[-1]
+    indicators = compute_indicator_panel(close)
+    above, bars_since = _macd_crosses(indicators['histogram'])
+    fresh = (bars_since >= 0) & (bars_since < MACD_CROSS_LOOKBACK)
+    macd = np.where(
+        fresh,
+        np.where(above, 'Bullish cross', 'Bearish cross'),
+        np.where(above, 'Above signal', 'Below signal')
+    )
+
+    levels = panel if levels is None else levels
+    with np.errstate(invalid='ignore'):
+        high_52w = np.nanmax(levels['High'][-TRADING_DAYS:], axis=0)
+        low_52w = np.nanmin(levels['Low'][-TRADING_DAYS:], axis=0)
+
+    forecasts, _, _ = forecast_batch(close, panel['Volume'], forecast_days)
+
+    table = pd.DataFrame({
+        'Ticker': tickers,
+        'Price': last,
+        'RSI': indicators['rsi'][-1],
+        'MACD': macd,
+        'Bars Since Cross': bars_since,
+        '% From 52W High': (last / high_52w - 1) * 100,
+        '% Above 52W Low': (last / low_52w - 1) * 100,
+        'Forecast Return %': (forecasts[:, -1] / last - 1) * 100,
+    }, columns=SCREEN_COLUMNS)
+    table = table.sort_values('Forecast Return %', ascending=False, ignore_index=True)
+    return table.round(2)
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import logging
+import datetime
+import os
+import json
+import tempfile
+import contextlib
+from io import StringIO
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write(path: str, write, mode: str = 'w'):
+    """
+    Write a file atomically: ``write(f)`` fills a temporary file in the same
+    directory, which then replaces ``path`` in a single rename. Readers in
+    other threads or processes see either the old or the new file, never a
+    partial one.
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+class JSONCacheBackend:
+    """
+    Original cache format: the info fields and ``history.to_json()`` stored
+    together in a single JSON document. Kept as a fallback backend.
+    """
+
+    extension = ".json"
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def path(self, key: str):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def modified_time(self, key: str):
+        """Return when the entry was written, or None if it does not exist."""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        return datetime.datetime.fromtimestamp(os.path.getctime(path))
+
+    def load(self, key: str):
+        with open(self.path(key), 'r') as f:
+            data = json.load(f)
+        data['history'] = pd.read_json(StringIO(data['history']))
+        return data
+
+    def save(self, key: str, data: dict):
+        payload = dict(data)
+        payload['history'] = data['history'].to_json(date_format='iso')
+        atomic_write(self.path(key), lambda f: json.dump(payload, f))
+
+
+class NumpyCacheBackend:
+    """
+    Columnar binary cache format.
+
+    The history columns are written as one (columns x rows) float64 ``.npy``
+    array, each column a contiguous row of it, and the index as a separate
+    int64 array of nanoseconds since the epoch (UTC). Both are loaded
+    memory-mapped and the DataFrame is built on top of them without
+    copying, so a cache hit skips all text parsing and only touches the
+    pages that are read. The frame is read-only. The info fields, column
+    order and index timezone live in a small JSON sidecar.
+    """
+
+    extension = ".npy"
+    index_extension = ".index.npy"
+    meta_extension = ".meta.json"
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def path(self, key: str):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def index_path(self, key: str):
+        return os.path.join(self.cache_dir, key + self.index_extension)
+
+    def meta_path(self, key: str):
+        return os.path.join(self.cache_dir, key + self.meta_extension)
+
+    def modified_time(self, key: str):
+        """Return when the entry was written, or None if it does not exist."""
+        path = self.path(key)
+        if not all(os.path.exists(p) for p in (path, self.index_path(key), self.meta_path(key))):
+            return None
+        return datetime.datetime.fromtimestamp(os.path.getctime(path))
+
+    def _to_arrays(self, history: pd.DataFrame):
+        """(columns x rows) float64 values and int64 UTC nanosecond stamps."""
+        index = pd.DatetimeIndex(history.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC')
+        stamps = np.ascontiguousarray(index.as_unit("ns").asi8, dtype='<i8')
+
+        values = np.empty((len(history.columns), len(history)), dtype='<f8')
+        for position, name in enumerate(history.columns):
+            values[position] = history[name].to_numpy(dtype='float64')
+        return values, stamps
+
+    def load(self, key: str):
+        with open(self.meta_path(key), 'r') as f:
+            meta = json.load(f)
+
+        values = np.load(self.path(key), mmap_mode='r')
+        stamps = np.load(self.index_path(key), mmap_mode='r')
+        rows = meta.get('rows')
+        if values.shape != (len(meta['columns']), rows) or stamps.shape != (rows,):
+            raise ValueError(f"Cache entry {key} is being rewritten (shape mismatch)")
+
+        index = pd.DatetimeIndex(pd.to_datetime(stamps, unit='ns', utc=True))
+        index = index.tz_convert(meta['tz']) if meta['tz'] else index.tz_localize(None)
+        index.name = meta.get('index_name')
+
+        # values.T is a (rows x columns) view; pandas keeps it as one block over the mmap
+        history = pd.DataFrame(values.T, columns=meta['columns'], index=index, copy=False)
+
+        data = dict(meta['info'])
+        data['history'] = history
+        return data
+
+    def save(self, key: str, data: dict):
+        history = data['history']
+        tz = getattr(history.index, 'tz', None)
+        values, stamps = self._to_arrays(history)
+        meta = {
+            'info': {k: v for k, v in data.items() if k != 'history'},
+            'columns': [str(name) for name in history.columns],
+            'tz': str(tz) if tz is not None else None,
+            'index_name': history.index.name,
+            'rows': len(stamps),
+        }
+
+        # The sidecar goes last; load() rejects files whose shapes disagree with it
+        atomic_write(self.index_path(key), lambda f: np.save(f, stamps, allow_pickle=False), mode='wb')
+        atomic_write(self.path(key), lambda f: np.save(f, values, allow_pickle=False), mode='wb')
+        atomic_write(self.meta_path(key), lambda f: json.dump(meta, f))
+
+
+CACHE_BACKENDS = {
+    'npy': NumpyCacheBackend,
+    'json': JSONCacheBackend,
+}
+
+
+def create_cache_backend(name: str, cache_dir: str):
+    """Instantiate a cache backend by name ("npy" or "json")."""
+    try:
+        return CACHE_BACKENDS[name](cache_dir)
+    except KeyError:
+        raise ValueError(f"Unknown cache backend '{name}', expected one of {sorted(CACHE_BACKENDS)}")
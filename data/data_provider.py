@@ -1,76 +1,722 @@
-import yfinance as yf
 import logging
 import functools
 import datetime
-import os
 import json
+import os
+import sys
+import threading
+import contextlib
+import pandas as pd
+from collections import OrderedDict, Counter
+from concurrent.futures import ThreadPoolExecutor
+from data.cache_backends import JSONCacheBackend, atomic_write, create_cache_backend
+from monitoring import metrics
 
 logger = logging.getLogger(__name__)
 
 # Cache configuration
 CACHE_DIR = "cache"
-os.makedirs(CACHE_DIR, exist_ok=True)  # Create cache directory if it doesn't exist
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "npy")  # "npy" (binary, memory-mapped) or "json"
+CACHE_TTL = datetime.timedelta(hours=24)
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("MEMORY_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Extend expired entries with only the missing bars instead of refetching the whole period
+INCREMENTAL_REFRESH = os.getenv("INCREMENTAL_REFRESH", "1") != "0"
+# Batched fetches (get_many): worker pool size and tickers per bulk download
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", 8))
+BATCH_CHUNK_SIZE = 100
+# Request counts are added to this file in the cache directory, so a standalone
+# cache warmer and other app processes see the same popularity
+POPULARITY_FILE = ".popularity.json"
+POPULARITY_FLUSH_INTERVAL = datetime.timedelta(minutes=1)
+
+
+def _estimate_size(data: dict):
+    """Approximate in-memory size of a stock data dict in bytes."""
+    size = sys.getsizeof(data)
+    for key, value in data.items():
+        if hasattr(value, 'memory_usage'):
+            size += int(value.memory_usage(index=True, deep=True).sum())
+        else:
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+class MemoryCache:
+    """
+    Bounded in-process LRU tier in front of the on-disk cache.
+
+    Entries expire at the same moment as the disk entry they were loaded
+    from, and the least recently used entries are evicted once the total
+    size exceeds ``max_bytes``. Cached dicts are shared between callers and
+    must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int = MEMORY_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, data)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, size, data = entry
+            if datetime.datetime.now() >= expires_at:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: dict, expires_at: datetime.datetime):
+        size = _estimate_size(data)
+        if size > self.max_bytes:
+            logger.info(f"Entry {key} ({size} bytes) exceeds the memory cache limit, not cached.")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, data)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current usage."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# Shared by every provider instance in the process
+_memory_cache = MemoryCache()
+
+
+def _memory_cache_metrics():
+    stats = _memory_cache.stats()
+    return [
+        ('cache_requests_total', {'cache': 'memory', 'result': 'hit'}, stats['hits']),
+        ('cache_requests_total', {'cache': 'memory', 'result': 'miss'}, stats['misses']),
+        ('memory_cache_bytes', {}, stats['bytes']),
+        ('memory_cache_entries', {}, stats['entries']),
+        ('memory_cache_evictions_total', {}, stats['evictions']),
+    ]
+
+
+metrics.register_collector(_memory_cache_metrics)
+_request_counts = Counter()  # ticker -> get_stock_data calls not yet added to POPULARITY_FILE
+_request_counts_lock = threading.Lock()
+_request_counts_flushed_at = datetime.datetime.now()
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    """Exclusive advisory lock on ``path`` shared by every process using the cache."""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _Flight:
+    """A fetch in progress that other threads can wait on."""
 
-class YFinanceDataProvider:
     def __init__(self):
-        pass
+        self.done = threading.Event()
+        self.result = None
+
+
+_inflight = {}  # cache key -> _Flight
+_inflight_lock = threading.Lock()
+
+
+def _single_flight(key: str, fetch):
+    """
+    Run ``fetch`` once per key at a time.
+
+    Threads asking for a key that is already being fetched wait for that
+    fetch and share its result instead of starting their own.
+    """
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _inflight[key] = _Flight()
+
+    if not is_leader:
+        flight.done.wait()
+        return flight.result
+
+    try:
+        flight.result = fetch()
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        flight.done.set()
+    return flight.result
+
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+
+def period_start(period: str, end: pd.Timestamp):
+    """First timestamp covered by a yfinance period ending at ``end``, None for "max"."""
+    if period == 'ytd':
+        return pd.Timestamp(year=end.year, month=1, day=1, tz=end.tz)
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        return None
+    return end - offset
+
+
+def period_covers(covered: str, period: str, end: pd.Timestamp):
+    """
+    Whether a history of period ``covered`` ending at ``end`` includes every
+    bar of ``period``. Decided by start date rather than by a fixed order of
+    periods, because how much 'ytd' covers changes through the year.
+    Unknown periods cover as much as "max"; None covers nothing.
+    """
+    if covered is None:
+        return False
+    if covered == period:
+        return True
+    covered_start = period_start(covered, end)
+    if covered_start is None:
+        return True
+    requested_start = period_start(period, end)
+    return requested_start is not None and requested_start >= covered_start
+
+
+def slice_period(history: pd.DataFrame, period: str):
+    """The bars of ``history`` within ``period`` of its last bar."""
+    if len(history):
+        start = period_start(period, history.index[-1])
+        if start is not None:
+            history = history.iloc[history.index.searchsorted(start):]
+    return history
+
+
+def longest_period(period: str, other: str, end: pd.Timestamp):
+    """Whichever of ``period`` and ``other`` (may be None) reaches further back from ``end``."""
+    return other if period_covers(other, period, end) else period
+
+
+def _last_bar(data: dict):
+    """Timestamp of the last cached bar, or now when the history is empty."""
+    history = data['history'] if data else None
+    if history is not None and len(history) and isinstance(history.index, pd.DatetimeIndex):
+        return history.index[-1]
+    return pd.Timestamp.now()
+
+
+HISTORY_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+
+def _yfinance():
+    """yfinance, imported on first use: it is slow to import and cache hits never need it."""
+    import yfinance
+    return yfinance
+
+
+class YFinanceClient:
+    """
+    Network layer used by YFinanceDataProvider.
+
+    Wraps the yfinance calls the provider needs so they can be replaced by a
+    fake client for offline testing.
+    """
+
+    def info(self, ticker: str):
+        return _yfinance().Ticker(ticker).info
+
+    def history(self, ticker: str, period: str = None, start=None):
+        stock = _yfinance().Ticker(ticker)
+        if start is not None:
+            return stock.history(start=start)
+        return stock.history(period=period)
+
+    def download(self, tickers: list, period: str):
+        """
+        Bulk-download daily history for several tickers in one request.
+
+        Returns a dict of ticker -> DataFrame shaped like ``Ticker.history``.
+        Tickers with no data are left out.
+        """
+        frame = _yfinance().download(
+            tickers,
+            period=period,
+            group_by='ticker',
+            auto_adjust=True,
+            actions=True,
+            threads=True,
+            progress=False
+        )
+
+        histories = {}
+        for ticker in tickers:
+            if isinstance(frame.columns, pd.MultiIndex):
+                if ticker not in frame.columns.get_level_values(0):
+                    continue
+                history = frame[ticker]
+            else:
+                history = frame
+
+            history = history.dropna(how='all')
+            history = history[[column for column in HISTORY_COLUMNS if column in history.columns]]
+            history.columns.name = None
+            if not history.empty:
+                histories[ticker] = history
+        return histories
+
+
+class YFinanceDataProvider:
+    def __init__(self, cache_backend=None, memory_cache=None, client=None):
+        self.client = client or YFinanceClient()
+        self.cache_backend = cache_backend or create_cache_backend(CACHE_BACKEND, CACHE_DIR)
+        # Entries written in JSON (the other backend) are still readable
+        self.fallback_backend = None
+        if not isinstance(self.cache_backend, JSONCacheBackend):
+            self.fallback_backend = JSONCacheBackend(self.cache_backend.cache_dir)
+        self.memory_cache = memory_cache or _memory_cache
+        # Cache files, lock files and indicator state all live in the cache directory
+        os.makedirs(self.cache_backend.cache_dir, exist_ok=True)
+
+    def _cache_key(self, ticker: str):
+        """
+        Generate the cache key for a ticker.
 
-    def _cache_key(self, ticker: str, period: str):
-        """Generate a unique cache key based on parameters."""
-        return f"{ticker}_{period}.json"
+        Every period shares one canonical daily series per ticker, covering
+        the longest period requested so far (see ``covered_period``).
+        """
+        return ticker.upper()
+
+    def _covers(self, data: dict, period: str):
+        """Whether cached ``data`` includes every bar of ``period``."""
+        return bool(data) and period_covers(data.get('covered_period'), period, _last_bar(data))
+
+    def _slice_period(self, data: dict, period: str):
+        """Return the info fields and the tail of the canonical history covering ``period``."""
+        history = data['history']
+        if period != data.get('covered_period'):
+            history = slice_period(history, period)
+
+        result = {key: value for key, value in data.items() if key not in ('history', 'covered_period')}
+        result['history'] = history
+        return result
+
+    def _load_from_backend(self, backend, key: str):
+        file_creation_time = backend.modified_time(key)
+        if file_creation_time is None:
+            return None
+
+        # Check if cache has expired (see CACHE_TTL)
+        expires_at = file_creation_time + CACHE_TTL
+        if datetime.datetime.now() < expires_at:
+            with metrics.timed('cache_load'):
+                data = backend.load(key)
+            self.memory_cache.put(key, data, expires_at)
+            return data
+
+        logger.info(f"Cache expired for {key}, refreshing data.")
+        return None
 
     def _load_from_cache(self, key: str):
-        """Load data from cache if present and valid."""
-        cache_path = os.path.join(CACHE_DIR, key)
+        """Load data from the memory tier, then from disk if present and valid."""
+        data = self.memory_cache.get(key)
+        if data is not None:
+            return data
+
         try:
-            if os.path.exists(cache_path):
-                # Check if cache has expired (e.g., 24 hours)
-                file_creation_time = datetime.datetime.fromtimestamp(os.path.getctime(cache_path))
-                if datetime.datetime.now() - file_creation_time < datetime.timedelta(hours=24):
-                    with open(cache_path, 'r') as f:
-                        return json.load(f)
-                else:
-                    logger.info(f"Cache expired for {key}, refreshing data.")
-                    return None
-            else:
-                return None
+            data = self._load_from_backend(self.cache_backend, key)
+            if data is None and self.fallback_backend is not None:
+                data = self._load_from_backend(self.fallback_backend, key)
+            metrics.record_cache('disk', data is not None)
+            return data
         except Exception as e:
             logger.error(f"Error loading from cache {key}: {e}")
             return None
 
+    def _load_stale(self, key: str):
+        """Load an entry regardless of its age, used as the base for incremental refresh."""
+        try:
+            if self.cache_backend.modified_time(key) is not None:
+                return self.cache_backend.load(key)
+            if self.fallback_backend is not None and self.fallback_backend.modified_time(key) is not None:
+                return self.fallback_backend.load(key)
+        except Exception as e:
+            logger.error(f"Error loading stale cache entry {key}: {e}")
+        return None
+
+    def _extend_history(self, ticker: str, period: str, history: pd.DataFrame):
+        """
+        Fetch only the bars from the last cached bar onwards and merge them in.
+
+        The last cached bar is fetched again because it may have been stored
+        before the session closed. Returns None when a full refetch is needed:
+        an empty or malformed cache, or a split/dividend or price mismatch on
+        the overlapping bar, which means yfinance re-adjusted older prices.
+        """
+        if history is None or history.empty or not isinstance(history.index, pd.DatetimeIndex):
+            return None
+
+        last_bar = history.index[-1]
+        new_bars = self.client.history(ticker, start=last_bar.date())
+        if new_bars is None or new_bars.empty:
+            return history
+
+        if new_bars.index.tz != history.index.tz:
+            if history.index.tz is None:
+                new_bars = new_bars.tz_localize(None)
+            else:
+                new_bars = new_bars.tz_convert(history.index.tz)
+
+        if new_bars.index[0] != last_bar:
+            return None
+        overlap = new_bars.iloc[0]
+        if abs(overlap['Open'] - history['Open'].iloc[-1]) > 1e-6 * max(1.0, abs(overlap['Open'])):
+            return None
+        for column in ('Dividends', 'Stock Splits'):
+            if column in new_bars.columns and (new_bars[column].iloc[1:] != 0).any():
+                return None
+
+        merged = pd.concat([history.iloc[:-1], new_bars[history.columns]])
+        merged = merged[~merged.index.duplicated(keep='last')]
+
+        # Drop bars that fell out of the requested window
+        start = period_start(period, merged.index[-1])
+        if start is not None:
+            merged = merged[merged.index >= start]
+
+        logger.info(f"Incrementally refreshed {ticker} {period}: {len(new_bars) - 1} new bars")
+        return merged
+
     def _save_to_cache(self, key: str, data):
         """Save data to cache."""
-        cache_path = os.path.join(CACHE_DIR, key)
+        self.memory_cache.put(key, data, datetime.datetime.now() + CACHE_TTL)
         try:
-            with open(cache_path, 'w') as f:
-                json.dump(data, f)
+            with metrics.timed('cache_save'):
+                self.cache_backend.save(key, data)
             logger.info(f"Data saved to cache: {key}")
         except Exception as e:
             logger.error(f"Error saving to cache {key}: {e}")
 
+    def _build_data(self, info: dict, history: pd.DataFrame, covered_period: str):
+        return {
+            'current_price': info.get('currentPrice'),
+            'market_cap': info.get('marketCap'),
+            'fiftyTwoWeekHigh': info.get('fiftyTwoWeekHigh'),
+            'fiftyTwoWeekLow': info.get('fiftyTwoWeekLow'),
+            'covered_period': covered_period,
+            'history': history
+        }
+
     def get_stock_data(self, ticker: str, period: str = "1y"):
-        """Retrieve data from YFinance, using cache if possible."""
-        cache_key = self._cache_key(ticker, period)
-        cached_data = self._load_from_cache(cache_key)
+        """
+        Retrieve data from YFinance, using cache if possible.
+
+        Periods shorter than the cached canonical series are served as a slice
+        of it without a network fetch. The returned dict holds the info fields
+        and the history as a DataFrame.
+        """
+        global _request_counts_flushed_at
+        cache_key = self._cache_key(ticker)
+        with _request_counts_lock:
+            _request_counts[cache_key] += 1
+            flush = datetime.datetime.now() - _request_counts_flushed_at >= POPULARITY_FLUSH_INTERVAL
+            if flush:
+                _request_counts_flushed_at = datetime.datetime.now()
+        if flush:
+            self.flush_popularity()
+
+        while True:
+            cached_data = self._load_from_cache(cache_key)
+            if self._covers(cached_data, period):
+                return self._slice_period(cached_data, period)
+
+            data = _single_flight(cache_key, lambda: self._fetch_locked(ticker, period))
+            if data is None:
+                return None
+            if self._covers(data, period):
+                return self._slice_period(data, period)
+            # We waited on a concurrent fetch of a shorter period; fetch again for ours
+
+    def get_cached_history(self, ticker: str):
+        """Full canonical history for ``ticker`` from the cache (no network), or None."""
+        data = self._load_from_cache(self._cache_key(ticker))
+        return data['history'] if data else None
+
+    def refresh(self, ticker: str, period: str = None):
+        """
+        Refetch a ticker now, even if its cache entry has not expired yet.
 
-        if cached_data:
-            return cached_data
+        Keeps the period already covered by the cache unless a longer
+        ``period`` is given. Returns the refreshed data or None on failure.
+        """
+        cache_key = self._cache_key(ticker)
+
+        def fetch():
+            with _file_lock(self._lock_path(cache_key)):
+                base_data = self._load_stale(cache_key)
+                fetch_period = period or (base_data.get('covered_period') if base_data else None) or "1y"
+                return self._fetch(ticker, fetch_period, base_data)
+
+        data = _single_flight(cache_key, fetch)
+        if data is None:
+            return None
+        return self._slice_period(data, period or data['covered_period'])
+
+    def _lock_path(self, key: str):
+        return os.path.join(self.cache_backend.cache_dir, key + ".lock")
+
+    def _fetch_locked(self, ticker: str, period: str):
+        """
+        Fetch under the cross-process lock for the ticker.
+
+        Another process may have refreshed the entry while we waited for the
+        lock, so the cache is checked again before going to the network.
+        """
+        cache_key = self._cache_key(ticker)
+        with _file_lock(self._lock_path(cache_key)):
+            self.memory_cache.invalidate(cache_key)
+            cached_data = self._load_from_cache(cache_key)
+            if self._covers(cached_data, period):
+                return cached_data
+
+            base_data = cached_data
+            if base_data is None and INCREMENTAL_REFRESH:
+                base_data = self._load_stale(cache_key)
+            return self._fetch(ticker, period, base_data)
+
+    def _fetch(self, ticker: str, period: str, base_data):
+        """
+        Fetch from YFinance, extending ``base_data`` incrementally when possible.
+
+        Returns the full canonical data written to the cache, or None on failure.
+        """
+        cache_key = self._cache_key(ticker)
+
+        # Never shrink the canonical series below what was already requested
+        fetch_period = period
+        if base_data:
+            fetch_period = longest_period(period, base_data.get('covered_period'), _last_bar(base_data))
 
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            history = stock.history(period=period)
-
-            data = {
-                'current_price': info.get('currentPrice'),
-                'market_cap': info.get('marketCap'),
-                'fiftyTwoWeekHigh': info.get('fiftyTwoWeekHigh'),
-                'fiftyTwoWeekLow': info.get('fiftyTwoWeekLow'),
-                'history': history.to_json(date_format='iso') # Convert to JSON
-            }
+            metrics.increment('upstream_requests_total', service='yfinance')
+            with metrics.in_flight('yfinance'), metrics.timed('yfinance_fetch'):
+                info = self.client.info(ticker)
+
+                history = None
+                if INCREMENTAL_REFRESH and base_data is not None and self._covers(base_data, fetch_period):
+                    try:
+                        history = self._extend_history(ticker, fetch_period, base_data['history'])
+                    except Exception as e:
+                        logger.error(f"Incremental refresh failed for {ticker}, refetching {fetch_period}: {e}")
+                if history is None:
+                    history = self.client.history(ticker, period=fetch_period)
 
+            data = self._build_data(info, history, fetch_period)
             self._save_to_cache(cache_key, data)
             return data
         except Exception as e:
             logger.error(f"Error fetching data for {ticker}: {e}")
-            return None
\ No newline at end of file
+            metrics.record_upstream_error('yfinance', e)
+            return None
+
+    def _save_batch_entry(self, ticker: str, data: dict):
+        """
+        Write a get_many result under the ticker's lock, unless the entry was
+        meanwhile replaced by one covering a longer period (e.g. by a
+        concurrent get_stock_data). Returns the data that is now canonical.
+        """
+        cache_key = self._cache_key(ticker)
+        with _file_lock(self._lock_path(cache_key)):
+            self.memory_cache.invalidate(cache_key)
+            cached_data = self._load_from_cache(cache_key)
+            if cached_data and not period_covers(data['covered_period'], cached_data.get('covered_period'), _last_bar(cached_data)):
+                return cached_data
+            self._save_to_cache(cache_key, data)
+            return data
+
+    def cache_expires_at(self, ticker: str):
+        """When the cached entry for ``ticker`` expires, or None if nothing is cached."""
+        key = self._cache_key(ticker)
+        file_creation_time = self.cache_backend.modified_time(key)
+        if file_creation_time is None and self.fallback_backend is not None:
+            file_creation_time = self.fallback_backend.modified_time(key)
+        if file_creation_time is None:
+            return None
+        return file_creation_time + CACHE_TTL
+
+    def _popularity_path(self):
+        return os.path.join(self.cache_backend.cache_dir, POPULARITY_FILE)
+
+    def _load_popularity(self):
+        try:
+            with open(self._popularity_path(), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading request counts: {e}")
+            return {}
+
+    def flush_popularity(self):
+        """Add this process's request counts since the last flush to POPULARITY_FILE."""
+        with _request_counts_lock:
+            pending = dict(_request_counts)
+            _request_counts.clear()
+        if not pending:
+            return
+
+        path = self._popularity_path()
+        try:
+            with _file_lock(path + ".lock"):
+                counts = self._load_popularity()
+                for ticker, count in pending.items():
+                    counts[ticker] = counts.get(ticker, 0) + count
+                atomic_write(path, lambda f: json.dump(counts, f))
+        except OSError as e:
+            logger.error(f"Error saving request counts: {e}")
+            with _request_counts_lock:
+                _request_counts.update(pending)
+
+    def popularity(self):
+        """
+        Return ticker -> number of get_stock_data calls, from every process
+        sharing the cache directory (POPULARITY_FILE) plus this process's
+        counts not flushed yet.
+        """
+        counts = self._load_popularity()
+        with _request_counts_lock:
+            for ticker, count in _request_counts.items():
+                counts[ticker] = counts.get(ticker, 0) + count
+        return counts
+
+    def get_many(self, tickers: list, period: str = "1y", max_workers: int = BATCH_MAX_WORKERS):
+        """
+        Retrieve data for many tickers at once.
+
+        Cached tickers are served from the cache. The rest are fetched with
+        bulk downloads of up to BATCH_CHUNK_SIZE tickers each, and their info
+        requests run on a pool of ``max_workers`` threads. Everything fetched
+        is written to the cache.
+
+        Returns:
+            (results, errors): dicts of ticker -> stock data (as returned by
+            get_stock_data) and ticker -> error message.
+        """
+        results = {}
+        errors = {}
+        pending = {}  # fetch period -> tickers
+
+        for ticker in dict.fromkeys(ticker.upper() for ticker in tickers):
+            cached_data = self._load_from_cache(ticker)
+            if self._covers(cached_data, period):
+                results[ticker] = self._slice_period(cached_data, period)
+                continue
+            fetch_period = period
+            if cached_data:
+                fetch_period = longest_period(period, cached_data.get('covered_period'), _last_bar(cached_data))
+            pending.setdefault(fetch_period, []).append(ticker)
+
+        if not pending:
+            return results, errors
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            info_futures = {
+                ticker: pool.submit(self.client.info, ticker)
+                for group in pending.values() for ticker in group
+            }
+            download_futures = [
+                (fetch_period, chunk, pool.submit(self.client.download, chunk, fetch_period))
+                for fetch_period, group in pending.items()
+                for chunk in (group[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(group), BATCH_CHUNK_SIZE))
+            ]
+            metrics.increment('upstream_requests_total', len(info_futures) + len(download_futures), service='yfinance')
+
+            for fetch_period, chunk, future in download_futures:
+                try:
+                    histories = future.result()
+                except Exception as e:
+                    logger.error(f"Bulk download failed for {len(chunk)} tickers: {e}")
+                    metrics.record_upstream_error('yfinance', e)
+                    for ticker in chunk:
+                        errors[ticker] = f"Bulk download failed: {e}"
+                    continue
+
+                for ticker in chunk:
+                    history = histories.get(ticker)
+                    if history is None or history.empty:
+                        errors[ticker] = "No price data returned"
+                        continue
+                    try:
+                        info = info_futures[ticker].result()
+                    except Exception as e:
+                        errors[ticker] = f"Info request failed: {e}"
+                        metrics.record_upstream_error('yfinance', e)
+                        continue
+
+                    data = self._save_batch_entry(ticker, self._build_data(info, history, fetch_period))
+                    results[ticker] = self._slice_period(data, period)
+
+        if errors:
+            logger.warning(f"get_many: {len(errors)} of {len(results) + len(errors)} tickers failed")
+        return results, errors
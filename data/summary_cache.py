@@ -0,0 +1,171 @@
+import datetime
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+from data.cache_backends import atomic_write
+from data.data_provider import _file_lock
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_FILE = "gemini_summaries.json"
+SUMMARY_CACHE_TTL = datetime.timedelta(hours=float(os.getenv("SUMMARY_CACHE_TTL_HOURS", "12")))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "512"))
+
+
+def data_version(history: pd.DataFrame):
+    """
+    Identifies the state of a ticker's cached history: the last bar and its
+    close, which change whenever the history is refreshed. Every period of a
+    ticker is sliced from the same series and shares the version.
+    """
+    if not len(history):
+        return "empty"
+    return f"{history.index[-1].isoformat()}|{float(history['Close'].iloc[-1])!r}"
+
+
+def summary_key(query: str, ticker: str, period: str, version: str):
+    """Fingerprint of a summary request: report prompt, ticker, period and data version."""
+    payload = json.dumps([query, ticker.upper(), period, version])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SummaryCache:
+    """
+    Persistent LRU cache of Gemini summaries, shared by every process using
+    the cache directory.
+
+    Entries are keyed by ``summary_key`` and expire after ``ttl``. The key
+    includes the data version, so a refreshed history never hits an older
+    summary, and storing a summary for a new version of a ticker drops that
+    ticker's older versions. Every change is applied under a file lock to
+    the JSON file as currently on disk, so processes add to each other's
+    entries instead of overwriting them; a miss re-reads the file for
+    summaries written by other processes. Each entry records when it was
+    last used; hits update it in memory, the next change merges it into the
+    file, and eviction drops the least recently used entries.
+    """
+
+    def __init__(self, cache_dir: str, ttl: datetime.timedelta = SUMMARY_CACHE_TTL,
+                 max_entries: int = SUMMARY_CACHE_MAX_ENTRIES):
+        self.path = os.path.join(cache_dir, SUMMARY_CACHE_FILE)
+        self.lock_path = self.path + ".lock"
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = self._read()  # key -> {ticker, version, created, used, summary}, least recently used first
+
+    def _read(self):
+        """Entries as stored on disk, oldest first (empty if there is no file)."""
+        entries = OrderedDict()
+        if not os.path.exists(self.path):
+            return entries
+        try:
+            with open(self.path, 'r') as f:
+                stored = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading summary cache: {e}")
+            return entries
+        # Stored oldest first, which restores the LRU order
+        for key, entry in stored:
+            entries[key] = entry
+        return entries
+
+    @staticmethod
+    def _used(entry: dict):
+        return entry.get('used', entry['created'])
+
+    def _evict(self, entries: OrderedDict):
+        """``entries`` ordered by last use, without the least recently used beyond ``max_entries``."""
+        entries = OrderedDict(sorted(entries.items(), key=lambda item: self._used(item[1])))
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return entries
+
+    def _update(self, change):
+        """
+        Apply ``change`` (which edits an entries OrderedDict in place) to the
+        file as currently on disk, under the file lock, and adopt the result.
+        """
+        try:
+            with _file_lock(self.lock_path):
+                stored = self._read()
+                # Keep the later use of entries this process has also seen
+                for key, entry in self._entries.items():
+                    if key in stored and self._used(entry) > self._used(stored[key]):
+                        stored[key]['used'] = self._used(entry)
+                change(stored)
+                entries = self._evict(stored)
+                items = list(entries.items())
+                atomic_write(self.path, lambda f: json.dump(items, f))
+        except Exception as e:
+            logger.error(f"Error saving summary cache: {e}")
+            change(self._entries)
+            entries = self._evict(self._entries)
+        self._entries = entries
+
+    def _expired(self, entry: dict):
+        created = datetime.datetime.fromisoformat(entry['created'])
+        return datetime.datetime.now() - created >= self.ttl
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                # Another process may have stored it since we last read the file
+                entry = self._read().get(key)
+                if entry is not None:
+                    self._entries[key] = entry
+            if entry is None or self._expired(entry):
+                if entry is not None:
+                    self._update(lambda entries: entries.pop(key, None))
+                self.misses += 1
+                return None
+            entry['used'] = datetime.datetime.now().isoformat()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['summary']
+
+    def put(self, key: str, ticker: str, version: str, summary: str):
+        ticker = ticker.upper()
+        now = datetime.datetime.now().isoformat()
+        entry = {
+            'ticker': ticker,
+            'version': version,
+            'created': now,
+            'used': now,
+            'summary': summary,
+        }
+
+        def change(entries):
+            # A new data version supersedes every summary of the older ones
+            for stale_key in [k for k, stored in entries.items()
+                              if stored['ticker'] == ticker and stored['version'] != version]:
+                del entries[stale_key]
+            entries[key] = entry
+            entries.move_to_end(key)
+
+        with self._lock:
+            self._update(change)
+
+    def clear(self):
+        with self._lock:
+            self._update(lambda entries: entries.clear())
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
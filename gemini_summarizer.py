@@ -1,19 +1,253 @@
-from google import genai
-from google.genai import types
 from dotenv import load_dotenv
+import logging
 import os
+import random
+import threading
+import time
+from monitoring import metrics
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-def summarize_with_gemini(text: str, api_key: str):
-    """Summarizes a text using Gemini."""
+GEMINI_MODEL = 'gemini-1.5-flash'
+# Concurrent Gemini requests per API key
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+# Per-call timeout in seconds
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+# Optional endpoint override, e.g. a local fake server
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+
+# Rate limited / temporarily overloaded
+RETRYABLE_STATUS_CODES = {429, 503}
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+SUMMARY_ERROR = "Error: Could not generate summary with Gemini."
+
+class _StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _StubModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model: str, contents: str, **kwargs):
+        self._owner.calls.append({'model': model, 'contents': contents})
+        return _StubResponse(self._owner.reply(contents))
+
+    def generate_content_stream(self, model: str, contents: str, **kwargs):
+        self._owner.calls.append({'model': model, 'contents': contents, 'stream': True})
+        for word in self._owner.reply(contents).split(' '):
+            time.sleep(self._owner.chunk_delay)
+            yield _StubResponse(word + ' ')
+
+
+class StubGeminiClient:
+    """
+    Offline stand-in for ``genai.Client`` exposing the same
+    ``models.generate_content`` and ``models.generate_content_stream`` calls.
+    Replies are deterministic and every request is recorded in ``calls``;
+    streamed replies arrive one word every ``chunk_delay`` seconds. Select it
+    with ``GEMINI_CLIENT=stub``.
+    """
+
+    def __init__(self, reply=None, chunk_delay: float = 0.05):
+        self.calls = []
+        self.chunk_delay = chunk_delay
+        self.reply = reply or (lambda contents: f"Stub summary of {len(contents)} characters of input.")
+        self.models = _StubModels(self)
+
+
+def genai_transport(api_key: str, timeout: float, base_url: str = GEMINI_BASE_URL):
+    """Default transport: a ``genai.Client`` with the timeout (and endpoint) applied to its HTTP client."""
+    # Imported here: google.genai is slow to import and only needed for the first real call
+    from google import genai
+    from google.genai import types
+    http_options = types.HttpOptions(timeout=int(timeout * 1000), base_url=base_url)
+    return genai.Client(api_key=api_key, http_options=http_options)
+
+
+def _status_code(error: Exception):
+    return getattr(error, 'code', None) or getattr(error, 'status_code', None)
+
+
+class GeminiClientManager:
+    """
+    Long-lived Gemini client shared by every request.
+
+    The client (and its HTTP connection pool) is created once by
+    ``transport(api_key, timeout)`` and reused. At most ``max_concurrency``
+    calls run at once; rate-limit (429) and overload (503) responses are
+    retried with full-jitter exponential backoff, so bursts spread out
+    instead of failing together. Pass another ``transport`` (e.g. one
+    returning StubGeminiClient, or genai_transport with a local base_url)
+    for tests.
+    """
+
+    def __init__(self, api_key: str = None, transport=None, model: str = GEMINI_MODEL,
+                 max_concurrency: int = GEMINI_MAX_CONCURRENCY, timeout: float = GEMINI_TIMEOUT,
+                 max_retries: int = GEMINI_MAX_RETRIES):
+        self.api_key = api_key
+        self.transport = transport or genai_transport
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._client = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self.transport(self.api_key, self.timeout)
+            return self._client
+
+    def _acquire_slot(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            metrics.increment('upstream_errors_total', service='gemini', reason='no_slot')
+            raise TimeoutError(f"No Gemini slot available within {self.timeout:.0f}s")
+        metrics.increment('in_flight', 1, kind='gemini')
+
+    def _release_slot(self):
+        metrics.increment('in_flight', -1, kind='gemini')
+        self._slots.release()
+
+    def _count_call(self):
+        with self._lock:
+            self.calls += 1
+        metrics.increment('upstream_requests_total', service='gemini')
+
+    def _count_retry(self):
+        with self._lock:
+            self.retries += 1
+        metrics.increment('upstream_retries_total', service='gemini')
+
+    def _count_failure(self, error: Exception):
+        with self._lock:
+            self.failures += 1
+        metrics.record_upstream_error('gemini', error, status=_status_code(error))
+
+    def backoff_delay(self, attempt: int):
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    def generate(self, contents: str):
+        """Response text for ``contents``; raises once retries are exhausted or the wait times out."""
+        self._acquire_slot()
+        try:
+            attempt = 0
+            while True:
+                self._count_call()
+                try:
+                    response = self.client.models.generate_content(model=self.model, contents=contents)
+                    return response.text
+                except Exception as e:
+                    if _status_code(e) not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                        self._count_failure(e)
+                        raise
+                    delay = self.backoff_delay(attempt)
+                    logger.warning(f"Gemini returned {_status_code(e)}, retrying in {delay:.1f}s")
+                    self._count_retry()
+                    attempt += 1
+                    # Keep the slot while waiting so a quota burst also slows other callers
+                    time.sleep(delay)
+        finally:
+            self._release_slot()
+
+    def generate_stream(self, contents: str):
+        """
+        Yield response text chunks as they arrive.
+
+        Rate-limited calls are retried like ``generate`` as long as nothing
+        has been yielded yet; an error after the first chunk is raised.
+        """
+        self._acquire_slot()
+        try:
+            attempt = 0
+            while True:
+                self._count_call()
+                started = False
+                try:
+                    for chunk in self.client.models.generate_content_stream(model=self.model, contents=contents):
+                        if chunk.text:
+                            started = True
+                            yield chunk.text
+                    return
+                except Exception as e:
+                    if started or _status_code(e) not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                        self._count_failure(e)
+                        raise
+                    delay = self.backoff_delay(attempt)
+                    logger.warning(f"Gemini returned {_status_code(e)}, retrying in {delay:.1f}s")
+                    self._count_retry()
+                    attempt += 1
+                    time.sleep(delay)
+        finally:
+            self._release_slot()
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'retries': self.retries, 'failures': self.failures}
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_client_manager(api_key: str):
+    """Process-wide GeminiClientManager for ``api_key``."""
+    with _managers_lock:
+        if api_key not in _managers:
+            _managers[api_key] = GeminiClientManager(api_key)
+        return _managers[api_key]
+
+
+def _resolve_manager(api_key: str, client=None, manager=None):
+    if manager is not None:
+        return manager
+    if client is None:
+        return get_client_manager(api_key)
+    return GeminiClientManager(api_key, transport=lambda api_key, timeout: client)
+
+
+def summarize_with_gemini(text: str, api_key: str, client=None, manager=None):
+    """Summarizes a text using Gemini.
+
+    Calls go through ``manager`` (default: the shared manager for
+    ``api_key``); a bare ``client`` such as StubGeminiClient is wrapped in
+    its own manager.
+    """
+    try:
+        manager = _resolve_manager(api_key, client, manager)
+        with metrics.timed('gemini_summary'):
+            return manager.generate(f"Summarize the following text: {text}")
+    except Exception as e:
+        logger.error(f"Error during summarization with Gemini: {e}")
+        return SUMMARY_ERROR
+
+
+def summarize_with_gemini_stream(text: str, api_key: str, client=None, manager=None):
+    """Streaming summarize_with_gemini: yields text chunks as Gemini produces them.
+
+    On failure the error message is yielded as the last chunk.
+    """
+    started = False
+    start = time.perf_counter()
     try:
-        client = genai.Client(api_key=api_key)
-        response = client.models.generate_content(
-            model='gemini-1.5-flash',
-            contents=f"Summarize the following text: {text}",
-        )
-        return response.text
+        manager = _resolve_manager(api_key, client, manager)
+        with metrics.timed('gemini_summary'):
+            for chunk in manager.generate_stream(f"Summarize the following text: {text}"):
+                if not started:
+                    metrics.observe('stage_duration_seconds', time.perf_counter() - start, stage='gemini_first_chunk')
+                started = True
+                yield chunk
     except Exception as e:
-        print(f"Error during summarization with Gemini: {e}")
-        return "Error: Could not generate summary with Gemini."
+        logger.error(f"Error during summarization with Gemini: {e}")
+        yield ("\n\n" if started else "") + SUMMARY_ERROR
@@ -0,0 +1,222 @@
+import bisect
+import contextlib
+import http.server
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+METRICS_NAMESPACE = "stock_dashboard"
+# Port of the Prometheus text endpoint; 0 (the default) leaves it off
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Upper bounds of the duration histogram buckets, in seconds
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# name -> (type, help) of every metric the app reports
+METRICS = {
+    'stage_duration_seconds': ('histogram', "Time spent in each stage of the pipeline"),
+    'stage_errors_total': ('counter', "Stages that raised an exception"),
+    'in_flight': ('gauge', "Work currently in progress, by kind"),
+    'cache_requests_total': ('counter', "Cache lookups by cache and result"),
+    'cache_hit_ratio': ('gauge', "Share of lookups that hit, by cache, since the process started"),
+    'upstream_requests_total': ('counter', "Calls to yfinance and Gemini"),
+    'upstream_retries_total': ('counter', "Calls retried after a rate limit or overload"),
+    'upstream_errors_total': ('counter', "Failed calls to yfinance and Gemini, by reason"),
+    'memory_cache_bytes': ('gauge', "Estimated size of the in-process history cache"),
+    'memory_cache_entries': ('gauge', "Entries in the in-process history cache"),
+    'memory_cache_evictions_total': ('counter', "Entries evicted from the in-process history cache"),
+}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and duration histograms, rendered in the
+    Prometheus text format.
+
+    Samples are keyed by metric name (see METRICS) and label values.
+    Collectors registered with ``register_collector`` are called at render
+    time and return extra (name, labels, value) samples, for statistics
+    other classes already keep (e.g. MemoryCache.stats).
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._values = {}  # (name, labels) -> counter or gauge value
+        self._histograms = {}  # (name, labels) -> [count per bucket..., overflow, sum, count]
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            counts = self._histograms.get(key)
+            if counts is None:
+                counts = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def register_collector(self, collect):
+        with self._lock:
+            self._collectors.append(collect)
+
+    def samples(self):
+        """Counter and gauge samples, collectors included, as {(name, labels): value}."""
+        with self._lock:
+            values = dict(self._values)
+            collectors = list(self._collectors)
+        for collect in collectors:
+            try:
+                for name, labels, value in collect():
+                    key = (name, tuple(sorted(labels.items())))
+                    values[key] = values.get(key, 0) + value
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+        return values
+
+    def _hit_ratios(self, values):
+        lookups = {}
+        for (name, labels), value in values.items():
+            if name == 'cache_requests_total':
+                labels = dict(labels)
+                hits, total = lookups.get(labels.get('cache'), (0, 0))
+                lookups[labels.get('cache')] = (hits + (value if labels.get('result') == 'hit' else 0), total + value)
+        return {
+            ('cache_hit_ratio', (('cache', cache),)): hits / total
+            for cache, (hits, total) in lookups.items() if total
+        }
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        values = self.samples()
+        values.update(self._hit_ratios(values))
+        with self._lock:
+            histograms = {key: list(counts) for key, counts in self._histograms.items()}
+
+        families = {}
+        for (name, labels), value in values.items():
+            families.setdefault(name, []).append((labels, value))
+        for (name, labels), counts in histograms.items():
+            families.setdefault(name, []).append((labels, counts))
+
+        lines = []
+        for name in sorted(families):
+            kind, help_text = METRICS.get(name, ('untyped', ''))
+            full_name = f"{METRICS_NAMESPACE}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in sorted(families[name]):
+                if kind != 'histogram':
+                    lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), value):
+                    cumulative += count
+                    bucket_labels = labels + (('le', _format_value(bound)),)
+                    lines.append(f"{full_name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {value[-2]!r}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {value[-1]}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def increment(name: str, amount: float = 1, **labels):
+    registry.increment(name, amount, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    registry.observe(name, value, **labels)
+
+
+def register_collector(collect):
+    registry.register_collector(collect)
+
+
+def record_cache(cache: str, hit: bool):
+    registry.increment('cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+
+def record_upstream_error(service: str, error: BaseException, status=None):
+    """Count a failed upstream call by its HTTP ``status`` when known, else by exception type."""
+    registry.increment('upstream_errors_total', service=service, reason=status or type(error).__name__)
+
+
+@contextlib.contextmanager
+def timed(stage: str):
+    """
+    Record the duration of a block (or, as a decorator, of each call) under
+    ``stage_duration_seconds``; exceptions also count in ``stage_errors_total``.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        registry.increment('stage_errors_total', stage=stage)
+        raise
+    finally:
+        registry.observe('stage_duration_seconds', time.perf_counter() - start, stage=stage)
+
+
+@contextlib.contextmanager
+def in_flight(kind: str):
+    """Count a block in the ``in_flight`` gauge while it runs."""
+    registry.increment('in_flight', 1, kind=kind)
+    try:
+        yield
+    finally:
+        registry.increment('in_flight', -1, kind=kind)
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST):
+    """
+    Serve ``/metrics`` from a background thread. Returns the server (whose
+    ``server_address`` holds the bound port when ``port`` is 0).
+    """
+    server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Metrics available at http://{host}:{server.server_address[1]}/metrics")
+    return server
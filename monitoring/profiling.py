@@ -0,0 +1,69 @@
+import cProfile
+import itertools
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# When set, every dashboard request writes a cProfile dump (.prof) here
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+
+_sequence = itertools.count()
+
+
+class RequestProfile:
+    """
+    cProfile of one request whose work is spread over several threads.
+
+    Each call made through ``run`` is profiled on its own thread and
+    ``dump`` merges them into one file, readable with ``pstats`` or
+    snakeviz. Without ``profile_dir`` (PROFILE_DIR), ``run`` just calls the
+    function.
+    """
+
+    def __init__(self, label: str, profile_dir: str = PROFILE_DIR):
+        self.label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label)
+        self.profile_dir = profile_dir
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.profile_dir)
+
+    def run(self, function, *args):
+        if not self.enabled:
+            return function(*args)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process; run this part unprofiled
+            return function(*args)
+        try:
+            return function(*args)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def dump(self):
+        """Write the merged profile and return its path (None when disabled or nothing ran)."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not self.enabled or not profiles:
+            return None
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{next(_sequence)}-{self.label}.prof"
+        path = os.path.join(self.profile_dir, name)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        logger.info(f"Request profile written to {path}")
+        return path
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import Counter
+import pytest
+from data import data_provider
+from benchmarks.synthetic import synthetic_history
+from data.cache_backends import create_cache_backend
+from data.data_provider import MemoryCache, YFinanceDataProvider, slice_period
+
+
+class FakeClient:
+    """
+    Offline stand-in for YFinanceClient serving fixed histories.
+
+    Every call is recorded in ``calls`` as (method, ticker(s), period or
+    start); ``delay`` seconds are slept in each history/download call so
+    concurrent callers overlap, and ``max_concurrent`` keeps the most of
+    those calls seen running at once.
+    """
+
+    def __init__(self, histories: dict, delay: float = 0.0):
+        self.histories = histories
+        self.delay = delay
+        self.calls = []
+        self.max_concurrent = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def _record(self, *call):
+        with self._lock:
+            self.calls.append(call)
+
+    def _wait(self):
+        with self._lock:
+            self._running += 1
+            self.max_concurrent = max(self.max_concurrent, self._running)
+        time.sleep(self.delay)
+        with self._lock:
+            self._running -= 1
+
+    def count(self, method: str):
+        return sum(1 for call in self.calls if call[0] == method)
+
+    def info(self, ticker: str):
+        self._record('info', ticker)
+        close = float(self.histories[ticker]['Close'].iloc[-1])
+        return {'currentPrice': close, 'marketCap': close * 1e9}
+
+    def history(self, ticker: str, period: str = None, start=None):
+        self._record('history', ticker, period or start)
+        self._wait()
+        history = self.histories[ticker]
+        if start is not None:
+            return history[history.index.date >= start].copy()
+        return slice_period(history, period).copy()
+
+    def download(self, tickers: list, period: str):
+        self._record('download', tuple(tickers), period)
+        self._wait()
+        return {ticker: slice_period(self.histories[ticker], period).copy()
+                for ticker in tickers if ticker in self.histories}
+
+
+@pytest.fixture(autouse=True)
+def request_counts(monkeypatch):
+    """Start every test with no unflushed request counts from earlier tests."""
+    monkeypatch.setattr(data_provider, '_request_counts', Counter())
+    return data_provider._request_counts
+
+
+@pytest.fixture
+def histories():
+    """Five years of synthetic bars for a few tickers."""
+    return {ticker: synthetic_history(1260, seed=seed) for seed, ticker in enumerate(('AAA', 'BBB', 'CCC'))}
+
+
+@pytest.fixture(params=['npy', 'json'])
+def make_provider(request, tmp_path):
+    """Build providers over one temporary cache directory, for each cache backend."""
+    def make(client):
+        return YFinanceDataProvider(
+            cache_backend=create_cache_backend(request.param, str(tmp_path)),
+            memory_cache=MemoryCache(),
+            client=client
+        )
+    return make
+
+
+@pytest.fixture
+def fake_client(histories):
+    """Build a FakeClient, over the ``histories`` fixture unless others are given."""
+    def make(served=None, **kwargs):
+        return FakeClient(histories if served is None else served, **kwargs)
+    return make
@@ -0,0 +1,67 @@
+"""
+Both cache backends must round-trip a history; the npy backend must serve
+it straight from the memory-mapped files.
+
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import synthetic_history
+from data.cache_backends import CACHE_BACKENDS, NumpyCacheBackend, create_cache_backend
+
+
+def _entry(tz='America/New_York'):
+    history = synthetic_history(300, seed=4)
+    history.index = history.index.tz_convert(tz) if tz else history.index.tz_localize(None)
+    return {'current_price': 101.5, 'covered_period': '1y', 'history': history}
+
+
+def _instants(index):
+    index = index.as_unit('ns')
+    return index.tz_convert('UTC') if index.tz is not None else index
+
+
+@pytest.mark.parametrize('backend', sorted(CACHE_BACKENDS))
+@pytest.mark.parametrize('tz', ['America/New_York', 'UTC', None])
+def test_round_trip(tmp_path, backend, tz):
+    cache = create_cache_backend(backend, str(tmp_path))
+    entry = _entry(tz)
+    cache.save('TEST', entry)
+
+    assert cache.modified_time('TEST') is not None
+    loaded = cache.load('TEST')
+    assert loaded['current_price'] == 101.5 and loaded['covered_period'] == '1y'
+    actual, expected = loaded['history'], entry['history']
+    if backend == 'npy':
+        assert actual.index.tz == expected.index.tz
+    # JSON stores ISO strings without the index name, so only instants and values are compared
+    actual.index, expected.index = _instants(actual.index), _instants(expected.index)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_freq=False, check_names=backend == 'npy')
+
+
+def test_npy_columns_are_memory_mapped(tmp_path):
+    cache = NumpyCacheBackend(str(tmp_path))
+    cache.save('TEST', _entry())
+    history = cache.load('TEST')['history']
+
+    for name in history.columns:
+        column = history[name].to_numpy()
+        assert column.flags.c_contiguous and not column.flags.writeable, name
+        base = column
+        while base.base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert isinstance(base, np.memmap), name
+
+
+def test_npy_rejects_mismatched_sidecar(tmp_path):
+    cache = NumpyCacheBackend(str(tmp_path))
+    cache.save('TEST', _entry())
+    shorter = _entry()
+    shorter['history'] = shorter['history'].iloc[:-10]
+    # A writer replaced the arrays but not yet the sidecar
+    values, stamps = cache._to_arrays(shorter['history'])
+    np.save(cache.path('TEST'), values)
+    np.save(cache.index_path('TEST'), stamps)
+    with pytest.raises(ValueError):
+        cache.load('TEST')
@@ -0,0 +1,45 @@
+"""
+The cache warmer refreshes expired tickers concurrently, most requested
+first, with request counts shared through the cache directory.
+
+    python -m pytest tests
+"""
+import datetime
+from cache_warmer import CacheWarmer
+
+# Every cached entry expires within this margin, so all of them are due
+DUE_NOW = datetime.timedelta(days=2)
+
+
+def test_expired_tickers_are_refreshed_concurrently(make_provider, fake_client):
+    provider = make_provider(fake_client())
+    provider.get_many(['AAA', 'BBB', 'CCC'], '1y')
+
+    client = fake_client(delay=0.2)
+    warmer = CacheWarmer(['AAA', 'BBB', 'CCC'], data_provider=make_provider(client),
+                         refresh_margin=DUE_NOW, max_workers=3)
+    status = warmer.run_once()
+
+    assert status['due'] == 3 and status['processed'] == 3 and status['failed'] == []
+    assert client.count('download') == 0
+    assert client.max_concurrent == 3
+
+
+def test_missing_tickers_are_fetched_in_one_download(make_provider, fake_client):
+    client = fake_client()
+    status = CacheWarmer(['AAA', 'BBB', 'CCC'], data_provider=make_provider(client)).run_once()
+
+    assert status['processed'] == 3
+    assert client.count('download') == 1 and client.count('history') == 0
+
+
+def test_popularity_is_shared_through_the_cache_directory(make_provider, fake_client):
+    app = make_provider(fake_client())
+    for ticker in ('CCC', 'CCC', 'BBB'):
+        app.get_stock_data(ticker, '1y')
+    app.flush_popularity()
+
+    # A standalone warmer: a new provider over the same directory
+    warmer = CacheWarmer(['AAA', 'BBB', 'CCC'], data_provider=make_provider(fake_client()), refresh_margin=DUE_NOW)
+    assert warmer.data_provider.popularity() == {'CCC': 2, 'BBB': 1}
+    assert [ticker for ticker, _ in warmer.due_tickers()] == ['CCC', 'BBB', 'AAA']
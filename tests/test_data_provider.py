@@ -0,0 +1,135 @@
+"""
+YFinanceDataProvider against a fake yfinance client: incremental refresh,
+batched fetches and concurrent callers.
+
+    python -m pytest tests
+"""
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from data.data_provider import slice_period
+
+
+def _assert_same_history(actual, expected):
+    """Same bars and values; the JSON backend keeps neither the index name nor its timezone."""
+    actual, expected = actual.copy(), expected.copy()
+    actual.index = actual.index.as_unit('ns').tz_convert('UTC')
+    expected.index = expected.index.as_unit('ns').tz_convert('UTC')
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_freq=False, check_names=False)
+
+
+def _cache_stale(make_provider, fake_client, histories, bars_behind=5):
+    """Cache 1y of AAA as it was ``bars_behind`` bars ago."""
+    earlier = {ticker: history.iloc[:-bars_behind] for ticker, history in histories.items()}
+    make_provider(fake_client(earlier)).get_stock_data('AAA', '1y')
+
+
+def test_refresh_appends_new_bars(make_provider, fake_client, histories):
+    _cache_stale(make_provider, fake_client, histories)
+    client = fake_client()
+    data = make_provider(client).refresh('AAA')
+
+    # Only the bars from the last cached one onwards were requested
+    assert [call for call in client.calls if call[0] == 'history'] == [
+        ('history', 'AAA', histories['AAA'].index[-6].date())
+    ]
+    _assert_same_history(data['history'], slice_period(histories['AAA'], '1y'))
+
+
+def test_refresh_refetches_after_a_dividend(make_provider, fake_client, histories):
+    _cache_stale(make_provider, fake_client, histories)
+    histories['AAA'].iloc[-2, histories['AAA'].columns.get_loc('Dividends')] = 0.5
+    client = fake_client()
+    data = make_provider(client).refresh('AAA')
+
+    assert ('history', 'AAA', '1y') in client.calls
+    _assert_same_history(data['history'], slice_period(histories['AAA'], '1y'))
+
+
+def test_refresh_refetches_when_the_incremental_path_fails(make_provider, fake_client, histories):
+    _cache_stale(make_provider, fake_client, histories)
+    client = fake_client()
+    full_history = client.history
+
+    def history(ticker, period=None, start=None):
+        bars = full_history(ticker, period=period, start=start)
+        # New bars without an Open column: merging them raises
+        return bars.drop(columns='Open') if start is not None else bars
+
+    client.history = history
+    data = make_provider(client).refresh('AAA')
+
+    assert data is not None
+    assert ('history', 'AAA', '1y') in client.calls
+    _assert_same_history(data['history'], slice_period(histories['AAA'], '1y'))
+
+
+def test_get_many_fetches_in_one_download(make_provider, fake_client, histories):
+    client = fake_client()
+    results, errors = make_provider(client).get_many(['AAA', 'bbb', 'CCC', 'ZZZ'], '1y')
+
+    assert client.count('download') == 1
+    assert errors == {'ZZZ': "No price data returned"}
+    for ticker in ('AAA', 'BBB', 'CCC'):
+        _assert_same_history(results[ticker]['history'], slice_period(histories[ticker], '1y'))
+
+    # Stored for every period up to 1y, and served from the cache afterwards
+    stored = make_provider(fake_client())
+    assert stored._load_from_cache('BBB')['covered_period'] == '1y'
+    again = fake_client()
+    results, errors = make_provider(again).get_many(['AAA', 'BBB', 'CCC'], '6mo')
+    assert again.calls == [] and errors == {} and len(results) == 3
+
+
+def test_get_many_extends_a_shorter_cached_series(make_provider, fake_client, histories):
+    make_provider(fake_client()).get_stock_data('AAA', '1y')
+    client = fake_client()
+    results, _ = make_provider(client).get_many(['AAA'], '2y')
+
+    assert client.calls[-1] == ('download', ('AAA',), '2y')
+    assert make_provider(fake_client())._load_from_cache('AAA')['covered_period'] == '2y'
+    _assert_same_history(results['AAA']['history'], slice_period(histories['AAA'], '2y'))
+
+
+def test_get_many_keeps_a_longer_series_written_meanwhile(make_provider, fake_client, histories):
+    other = make_provider(fake_client())
+    client = fake_client()
+    download = client.download
+
+    def racing_download(tickers, period):
+        # A longer fetch for the same ticker lands while the batch is downloading
+        other.get_stock_data('AAA', '5y')
+        return download(tickers, period)
+
+    client.download = racing_download
+    results, errors = make_provider(client).get_many(['AAA', 'BBB'], '1y')
+
+    assert errors == {}
+    stored = make_provider(fake_client())
+    assert stored._load_from_cache('AAA')['covered_period'] == '5y'
+    assert len(stored._load_from_cache('AAA')['history']) == len(slice_period(histories['AAA'], '5y'))
+    assert stored._load_from_cache('BBB')['covered_period'] == '1y'
+    _assert_same_history(results['AAA']['history'], slice_period(histories['AAA'], '1y'))
+
+
+def _run_concurrently(functions):
+    with ThreadPoolExecutor(max_workers=len(functions)) as pool:
+        return list(pool.map(lambda function: function(), functions))
+
+
+def test_concurrent_callers_share_one_fetch(make_provider, fake_client):
+    client = fake_client(delay=0.2)
+    provider = make_provider(client)
+    results = _run_concurrently([lambda: provider.get_stock_data('AAA', '1y')] * 8)
+
+    assert client.count('history') == 1 and client.count('info') == 1
+    assert all(len(result['history']) == len(results[0]['history']) for result in results)
+
+
+def test_file_lock_serializes_fetches(make_provider, fake_client):
+    # Bypasses the in-process single flight, as separate processes would
+    client = fake_client(delay=0.2)
+    providers = [make_provider(client) for _ in range(4)]
+    results = _run_concurrently([lambda provider=provider: provider._fetch_locked('AAA', '1y') for provider in providers])
+
+    assert client.count('history') == 1
+    assert all(result is not None for result in results)
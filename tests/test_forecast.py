@@ -0,0 +1,139 @@
+"""
+The closed-form forecast model must match the original scikit-learn
+PolynomialFeatures + LinearRegression model, and forecasts must stay
+plausible on the single-ticker path and in forecast_batch alike.
+
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+from benchmarks.synthetic import synthetic_history, PERIOD_BARS
+from charting import forecast
+from charting.charts import forecast_from_prices
+from charting.forecast import (
+    build_training_set, fit_least_squares, forecast_batch, forecast_prices, plausible_forecasts,
+    polynomial_features, recursive_forecast, stack_histories, trend_forecast
+)
+
+try:
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import PolynomialFeatures
+except ImportError:  # sklearn is only a benchmark/test dependency
+    LinearRegression = PolynomialFeatures = None
+
+requires_sklearn = pytest.mark.skipif(LinearRegression is None, reason="scikit-learn is not installed")
+
+SEEDS = range(200)
+# Largest 15-day move accepted from a forecast of the synthetic series
+MAX_RETURN = 0.5
+# Terms of the degree-2 model: 4 inputs, then the 10 products x_i * x_j (i <= j)
+N_TERMS = 14
+# Coefficient of (previous close)^2 in that order
+PREVIOUS_SQUARED = 4 + 7
+
+
+def reference_forecast(prices, volumes, forecast_days=15):
+    """PolynomialFeatures + LinearRegression with one predict() call per forecast day."""
+    X, y = build_training_set(prices, volumes)
+    poly_features = PolynomialFeatures(degree=2, include_bias=False)
+    model = LinearRegression()
+    model.fit(poly_features.fit_transform(X), y)
+
+    forecasts = []
+    extended = list(prices)
+    for i in range(forecast_days):
+        position = len(prices) + i
+        features = [position, np.log(volumes[-1] + 1), extended[position - 1], extended[position - 5]]
+        prediction = model.predict(poly_features.transform([features]))[0]
+        forecasts.append(prediction)
+        extended.append(prediction)
+    return np.array(forecasts)
+
+
+def _history(bars, seed):
+    history = synthetic_history(bars, seed=seed)
+    return history['Close'].to_numpy(dtype='float64'), history['Volume'].to_numpy(dtype='float64')
+
+
+@pytest.mark.parametrize('period', ['3mo', '6mo', '1y'])
+def test_forecasts_stay_positive_and_bounded(period):
+    for seed in SEEDS:
+        prices, volumes = _history(PERIOD_BARS[period], seed)
+        forecasts, _ = forecast_from_prices(prices, volumes)
+        forecasts = np.asarray(forecasts)
+        assert np.isfinite(forecasts).all() and (forecasts > 0).all(), f"seed {seed}"
+        assert abs(forecasts[-1] / prices[-1] - 1) < MAX_RETURN, f"seed {seed}"
+
+
+@requires_sklearn
+@pytest.mark.parametrize('period', ['3mo', '6mo', '1y', '2y', '5y', '10y'])
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_sklearn_model(period, seed):
+    prices, volumes = _history(PERIOD_BARS[period], seed)
+    expected = reference_forecast(prices, volumes)
+
+    # The model itself, before the plausibility check
+    X, y = build_training_set(prices, volumes)
+    coef, intercept = fit_least_squares(polynomial_features(X), y)
+    np.testing.assert_allclose(recursive_forecast(coef, intercept, prices, volumes), expected, rtol=1e-6)
+
+    if plausible_forecasts(prices, expected):
+        np.testing.assert_allclose(forecast_prices(prices, volumes), expected, rtol=1e-6)
+
+
+def _diverging_models():
+    """Fitted models whose recursion is known to run away: (coefficients, intercept)."""
+    squared = np.zeros(N_TERMS)
+    squared[PREVIOUS_SQUARED] = 1.0         # p[t] = p[t-1]^2 overflows to inf
+    growing = np.zeros(N_TERMS)
+    growing[2] = 1.5                        # p[t] = 1.5 p[t-1], finite but implausible
+    flipping = np.zeros(N_TERMS)
+    flipping[2] = -1.0                      # p[t] = -p[t-1] goes negative
+    return {'overflow': (squared, 0.0), 'growth': (growing, 0.0), 'negative': (flipping, 0.0)}
+
+
+@pytest.mark.parametrize('model', sorted(_diverging_models()))
+def test_diverging_model_is_rejected(monkeypatch, model):
+    coef, intercept = _diverging_models()[model]
+    prices, volumes = _history(PERIOD_BARS['1y'], seed=0)
+    assert not plausible_forecasts(prices, recursive_forecast(coef, intercept, prices, volumes))
+
+    monkeypatch.setattr(forecast, 'fit_least_squares', lambda design, y: (coef, intercept))
+    with pytest.raises(ValueError):
+        forecast_prices(prices, volumes)
+
+    # The chart path falls back to the trend line
+    forecasts, _ = forecast_from_prices(prices, volumes)
+    np.testing.assert_allclose(forecasts, trend_forecast(prices))
+
+    tickers = 3
+    monkeypatch.setattr(forecast, '_fit_batch', lambda prices, volumes, starts: (
+        np.tile(coef, (tickers, 1)), np.full(tickers, intercept)
+    ))
+    panel_prices = np.column_stack([prices] * tickers)
+    panel_volumes = np.column_stack([volumes] * tickers)
+    batch, _, _ = forecast_batch(panel_prices, panel_volumes)
+    np.testing.assert_allclose(batch, np.tile(trend_forecast(prices), (tickers, 1)))
+
+
+def test_plausible_forecasts():
+    prices = np.linspace(100, 110, 40)
+    assert plausible_forecasts(prices, np.full(15, 111.0))
+    assert not plausible_forecasts(prices, np.full(15, -1.0))
+    assert not plausible_forecasts(prices, np.full(15, np.inf))
+    assert not plausible_forecasts(prices, np.full(15, 300.0))
+
+
+def test_trend_forecast_continues_the_window():
+    prices = np.arange(1.0, 253.0)
+    np.testing.assert_allclose(trend_forecast(prices, 3), [253.0, 254.0, 255.0])
+
+
+def test_batch_matches_single_ticker():
+    histories = {f"T{seed}": synthetic_history(PERIOD_BARS['3mo'], seed=seed) for seed in SEEDS}
+    tickers, prices, volumes = stack_histories(histories)
+    actual, _, _ = forecast_batch(prices, volumes)
+    for position, ticker in enumerate(tickers):
+        close = histories[ticker]['Close'].to_numpy(dtype='float64')
+        expected, _ = forecast_from_prices(close, histories[ticker]['Volume'].to_numpy(dtype='float64'))
+        np.testing.assert_allclose(actual[position], expected, rtol=1e-6, err_msg=ticker)
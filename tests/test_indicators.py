@@ -0,0 +1,22 @@
+"""
+IndicatorStore must return arrays aligned with the history it is given,
+whichever stored entry it extends.
+
+    python -m pytest tests
+"""
+import numpy as np
+from benchmarks.synthetic import synthetic_history
+from charting.indicators import IndicatorStore, compute_indicators
+
+
+def test_store_matches_full_computation(tmp_path):
+    history = synthetic_history(300, seed=1)
+    store = IndicatorStore(str(tmp_path))
+    # Grow, then shrink by one and two bars (the stored state already covers those bars)
+    for bars in (299, 300, 299, 298, 300):
+        window = history.iloc[:bars]
+        actual = store.get('TEST', window)
+        expected = compute_indicators(window['Close'].to_numpy(dtype='float64'))
+        for name, values in expected.items():
+            assert len(actual[name]) == bars, name
+            np.testing.assert_allclose(actual[name], values, err_msg=f"{name} at {bars} bars")
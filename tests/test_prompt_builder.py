@@ -0,0 +1,33 @@
+"""
+The prompt digest must only state a 52-week range it actually knows.
+
+    python -m pytest tests
+"""
+import pandas as pd
+from benchmarks.synthetic import synthetic_history
+from agents.prompt_builder import build_stock_digest
+from data.data_provider import slice_period
+
+
+def _levels(stock_data, history, full_history=None):
+    return dict(build_stock_digest('AAA', stock_data, history, full_history=full_history))['levels']
+
+
+def test_short_period_without_info_fields_has_no_range():
+    month = slice_period(synthetic_history(300, seed=1), '1mo')
+    assert _levels({}, month) == []
+
+
+def test_range_comes_from_the_full_series():
+    full = synthetic_history(600, seed=1)
+    month = slice_period(full, '1mo')
+    year = full['Close'][full.index >= full.index[-1] - pd.Timedelta(weeks=52)]
+
+    [line] = _levels({}, month, full)
+    assert line.startswith(f"52-week range: ${year.min():.2f} - ${year.max():.2f} ")
+
+
+def test_info_fields_take_precedence():
+    month = slice_period(synthetic_history(300, seed=1), '1mo')
+    [line] = _levels({'fiftyTwoWeekHigh': 250.0, 'fiftyTwoWeekLow': 50.0}, month)
+    assert line.startswith("52-week range: $50.00 - $250.00 ")
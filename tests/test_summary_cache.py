@@ -0,0 +1,52 @@
+"""
+Summary caches of several processes share one file without dropping each
+other's entries.
+
+    python -m pytest tests
+"""
+import datetime
+import time
+from data.summary_cache import SummaryCache
+
+
+def test_processes_merge_their_entries(tmp_path):
+    first, second = SummaryCache(str(tmp_path)), SummaryCache(str(tmp_path))
+    first.put('k1', 'aaa', 'v1', "first summary")
+    second.put('k2', 'bbb', 'v1', "second summary")
+
+    # Neither write dropped the other, and a miss picks up the other process's entry
+    assert SummaryCache(str(tmp_path)).stats()['entries'] == 2
+    assert first.get('k2') == "second summary"
+    assert second.get('k1') == "first summary"
+
+
+def test_new_version_drops_older_ones_everywhere(tmp_path):
+    first, second = SummaryCache(str(tmp_path)), SummaryCache(str(tmp_path))
+    first.put('old', 'AAA', 'v1', "old data")
+    second.put('other', 'BBB', 'v1', "other ticker")
+    second.put('new', 'AAA', 'v2', "new data")
+
+    fresh = SummaryCache(str(tmp_path))
+    assert fresh.get('old') is None
+    assert fresh.get('new') == "new data" and fresh.get('other') == "other ticker"
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = SummaryCache(str(tmp_path), max_entries=2)
+    cache.put('k1', 'AAA', 'v1', "one")
+    time.sleep(0.01)
+    cache.put('k2', 'BBB', 'v1', "two")
+    time.sleep(0.01)
+    assert cache.get('k1') == "one"
+    cache.put('k3', 'CCC', 'v1', "three")
+
+    fresh = SummaryCache(str(tmp_path), max_entries=2)
+    assert fresh.get('k2') is None
+    assert fresh.get('k1') == "one" and fresh.get('k3') == "three"
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = SummaryCache(str(tmp_path), ttl=datetime.timedelta(0))
+    cache.put('k1', 'AAA', 'v1', "one")
+    assert cache.get('k1') is None
+    assert SummaryCache(str(tmp_path)).stats()['entries'] == 0